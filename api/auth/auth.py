@@ -1,11 +1,14 @@
-from fastapi import HTTPException, Depends, Header
+from fastapi import HTTPException, Depends, Header, Request
 from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
+from api.services.last_login_tracker import last_login_tracker, api_key_usage_tracker
 
 from api.exceptions.exceptions import *
 
 user_database.create_init_user()
 
-def _get_current_user_perm_from_api_key(
+async def _get_current_user_perm_from_api_key(
+    request: Request,
     x_api_key: str = Header(
         user_database.demo_api_key,
         description="API key for authentication."
@@ -16,15 +19,23 @@ def _get_current_user_perm_from_api_key(
 
     This dependency function is designed to be used with FastAPI's
     `Depends`. It reads the API key from the request header, verifies
-    it against the user database and returns the permission record.
+    it against the async user database and returns the permission record.
 
     Raises HTTPException with appropriate status codes for empty,
     missing or invalid API keys.
     """
     try:
-        user_perm = user_database.get_user_perm_by_api_key(x_api_key)
+        user_perm = await async_user_database.get_user_perm_by_api_key(x_api_key)
         if not user_perm:
             raise UserPermReadError("Unexpected error loading user_perm: get_user_perm_by_api_key returned Null")
+
+        # Written in batches by the last login flush loop
+        last_login_tracker.record(user_perm["user_id"])
+        if user_perm.get("key_id"):
+            api_key_usage_tracker.record(user_perm["key_id"])
+
+        # Per user usage accounting (metrics middleware)
+        request.state.user_id = user_perm["user_id"]
         return user_perm
     except APIKeyEmptyError:
         raise HTTPException(status_code=400, detail="API key value can not be empty")
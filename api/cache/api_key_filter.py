@@ -0,0 +1,244 @@
+"""
+Probabilistic membership filter over stored API key hashes.
+
+A bloom filter answers "definitely unknown" without touching the database,
+so random keys (e.g. credential stuffing) are rejected before any pool
+checkout. False positives only fall through to the normal database lookup.
+
+Keys created by other workers only reach the filter through the user change
+listener, so the filter never rejects anything while the listener is not
+connected, and a small number of misses per second still reach the database
+to cover keys whose notification has not arrived yet.
+"""
+
+# Math, time and thread utilities
+import math
+import time
+import threading
+
+# Typing
+from typing import Iterable, Optional
+
+# Configuration
+from api.config.config import (
+    API_KEY_FILTER_ENABLED,
+    API_KEY_FILTER_CAPACITY,
+    API_KEY_FILTER_FALSE_POSITIVE_RATE,
+    API_KEY_FILTER_MISS_LOOKUPS_PER_SECOND,
+    USER_CHANGE_LISTENER_ENABLED
+)
+
+class ApiKeyFilter:
+    """
+    Bloom filter over HMAC digests of all stored API keys.
+
+    The stored values are already uniformly distributed HMAC digests, so the
+    bit positions are taken from the digest itself (double hashing) instead
+    of hashing again.
+
+    Bloom filters can not forget values. Deleted keys are only counted and
+    stay "maybe present" until the next `build()`.
+    """
+
+    def __init__(self, capacity: int = 100000, false_positive_rate: float = 0.01, miss_lookups_per_second: float = 20.0, enabled: bool = True):
+        """
+        Initialize an empty, not yet ready filter.
+
+        Args:
+            capacity: Expected number of stored keys.
+            false_positive_rate: Target false positive rate at `capacity` keys.
+            miss_lookups_per_second: Misses per second that are still passed to the database.
+            enabled: If False the filter never rejects anything.
+        """
+        self.capacity = max(1, int(capacity))
+        self.false_positive_rate = false_positive_rate
+        self.miss_lookups_per_second = max(0.0, float(miss_lookups_per_second))
+        self.enabled = enabled
+
+        # Only set while the user change listener is connected and the filter was rebuilt after connecting
+        self.synced = False
+
+        # Token bucket for misses passed to the database
+        self._miss_tokens = self.miss_lookups_per_second
+        self._miss_refilled_at = time.monotonic()
+
+        self._bits: Optional[bytearray] = None
+        self._size = 0
+        self._hash_count = 0
+        self._lock = threading.Lock()
+
+        self._building = False
+        self._build_log: list = []
+
+        # Counters
+        self.items = 0
+        self.removed = 0
+        self.rejected = 0
+        self.passed = 0
+        self.miss_lookups = 0
+
+    def is_ready(self) -> bool:
+        """Return whether the filter has been built."""
+        return self._bits is not None
+
+    def build(self, key_hashes: Iterable) -> int:
+        """
+        (Re)build the filter from all stored key hashes.
+
+        Keys added while the build is running are replayed afterwards, so
+        creations racing with a rebuild are never lost.
+
+        Args:
+            key_hashes: Iterable over all stored API key hashes.
+
+        Returns:
+            int: Number of keys in the new filter.
+        """
+        with self._lock:
+            self._building = True
+            self._build_log = []
+
+        try:
+            hashes = [key_hash for key_hash in key_hashes if key_hash]
+
+            size, hash_count = self._dimensions(max(self.capacity, len(hashes) * 2))
+            bits = bytearray((size + 7) // 8)
+
+            for key_hash in hashes:
+                self._set_bits(bits, size, hash_count, key_hash)
+
+            with self._lock:
+                for key_hash in self._build_log:
+                    self._set_bits(bits, size, hash_count, key_hash)
+
+                self._bits, self._size, self._hash_count = bits, size, hash_count
+                self.items = len(hashes) + len(self._build_log)
+                self.removed = 0
+
+            return self.items
+
+        finally:
+            with self._lock:
+                self._building = False
+                self._build_log = []
+
+    def add(self, key_hash) -> None:
+        """Add a key hash (adding the same hash twice is harmless)."""
+        if not key_hash:
+            return
+
+        with self._lock:
+            if self._building:
+                self._build_log.append(key_hash)
+
+            if self._bits is not None:
+                self._set_bits(self._bits, self._size, self._hash_count, key_hash)
+                self.items += 1
+
+    def mark_synced(self, synced: bool) -> None:
+        """Set whether the filter is kept up to date with keys created by other workers."""
+        self.synced = synced
+
+    def discard(self) -> None:
+        """Record that a stored key was deleted or replaced."""
+        with self._lock:
+            self.removed += 1
+
+    def needs_rebuild(self) -> bool:
+        """Return whether enough keys were removed or added to warrant a rebuild."""
+        return self.is_ready() and (
+            self.removed > max(100, self.items // 10)
+            or self.items > self.capacity_of_current_filter()
+        )
+
+    def capacity_of_current_filter(self) -> int:
+        """Number of keys the current bit array was sized for."""
+        if not self._hash_count:
+            return 0
+        return int(self._size * (math.log(2) ** 2) / -math.log(self.false_positive_rate))
+
+    def might_contain(self, key_hash) -> bool:
+        """
+        Return False only if the key hash is definitely not stored.
+
+        Returns True while the filter is disabled, not yet built or not
+        synced with other workers. Misses within the per second lookup
+        budget also return True, a key created on another worker may not
+        have been announced yet.
+        """
+        bits = self._bits
+        if not self.enabled or not self.synced or bits is None:
+            return True
+
+        size, hash_count = self._size, self._hash_count
+        for index in self._indexes(key_hash, size, hash_count):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                if self._take_miss_lookup():
+                    self.miss_lookups += 1
+                    return True
+
+                self.rejected += 1
+                return False
+
+        self.passed += 1
+        return True
+
+    def stats(self) -> dict:
+        """Return filter dimensions and counters."""
+        return {
+            "enabled": self.enabled,
+            "ready": self.is_ready(),
+            "synced": self.synced,
+            "items": self.items,
+            "removed": self.removed,
+            "size_bits": self._size,
+            "hash_count": self._hash_count,
+            "rejected": self.rejected,
+            "passed": self.passed,
+            "miss_lookups": self.miss_lookups,
+        }
+
+    def _take_miss_lookup(self) -> bool:
+        """Take a token from the miss lookup budget, return False if it is used up."""
+        with self._lock:
+            now = time.monotonic()
+            self._miss_tokens = min(
+                self.miss_lookups_per_second,
+                self._miss_tokens + (now - self._miss_refilled_at) * self.miss_lookups_per_second
+            )
+            self._miss_refilled_at = now
+
+            if self._miss_tokens < 1:
+                return False
+
+            self._miss_tokens -= 1
+            return True
+
+    def _dimensions(self, capacity: int) -> tuple[int, int]:
+        """Return (bit count, hash count) for the capacity and target false positive rate."""
+        size = max(64, int(math.ceil(-capacity * math.log(self.false_positive_rate) / (math.log(2) ** 2))))
+        hash_count = max(1, int(round(size / capacity * math.log(2))))
+        return size, hash_count
+
+    def _set_bits(self, bits: bytearray, size: int, hash_count: int, key_hash) -> None:
+        """Set all bits for a key hash."""
+        for index in self._indexes(key_hash, size, hash_count):
+            bits[index >> 3] |= 1 << (index & 7)
+
+    def _indexes(self, key_hash, size: int, hash_count: int):
+        """Derive `hash_count` bit positions from the digest (Kirsch-Mitzenmacher double hashing)."""
+        digest = bytes(key_hash)
+
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+
+        for i in range(hash_count):
+            yield (h1 + i * h2) % size
+
+# Global singleton instance (without the listener keys created by other workers would be rejected forever)
+api_key_filter = ApiKeyFilter(
+    capacity=API_KEY_FILTER_CAPACITY,
+    false_positive_rate=API_KEY_FILTER_FALSE_POSITIVE_RATE,
+    miss_lookups_per_second=API_KEY_FILTER_MISS_LOOKUPS_PER_SECOND,
+    enabled=API_KEY_FILTER_ENABLED and USER_CHANGE_LISTENER_ENABLED
+)
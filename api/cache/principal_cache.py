@@ -0,0 +1,185 @@
+"""
+In-process cache for resolved API key principals.
+"""
+
+# Time and thread utilities
+import time
+import threading
+
+# Ordered dict for LRU bookkeeping
+from collections import OrderedDict
+
+# Typing
+from typing import Any, Optional
+
+# Cache configuration
+from api.config.config import PRINCIPAL_CACHE_ENABLED, PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL
+
+class PrincipalCache:
+    """
+    Bounded LRU cache with a TTL that maps API key hashes to principal records.
+
+    Every entry belongs to an owner (the user_id) so all keys of a user can
+    be evicted at once when the user's permissions, auth data or existence
+    change.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0, enabled: bool = True):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of entries before the least recently used one is evicted.
+            ttl: Time in seconds an entry stays valid.
+            enabled: If False every lookup is a miss and nothing is stored.
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl)
+        self.enabled = enabled
+
+        self._entries: OrderedDict = OrderedDict() # key -> (expires_at, owner, value)
+        self._owner_keys: dict[str, set] = {} # owner -> keys
+        self._epoch = 0 # Bumped on every invalidation
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def epoch(self) -> int:
+        """
+        Return the current invalidation epoch.
+
+        Take the epoch before reading from the database and pass it to `set()`.
+        If an invalidation happened in between, the (possibly stale) value is
+        not stored.
+        """
+        with self._lock:
+            return self._epoch
+
+    def get(self, key) -> Optional[dict]:
+        """
+        Return a copy of the cached value for `key` or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, owner, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def set(self, key, owner: Any, value: dict, epoch: Optional[int] = None, ttl: Optional[float] = None) -> bool:
+        """
+        Store `value` for `key`.
+
+        Args:
+            key: Cache key (API key hash).
+            owner: Owner of the entry (user_id), used for invalidation.
+            value: Record to cache. A copy is stored.
+            epoch: Epoch returned by `epoch()` before the value was loaded.
+            ttl: Optional TTL override, capped at the configured TTL.
+
+        Returns:
+            True if the value was stored.
+        """
+        if not self.enabled:
+            return False
+
+        entry_ttl = self.ttl if ttl is None else min(self.ttl, ttl)
+        if entry_ttl <= 0:
+            return False
+
+        owner = str(owner)
+
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + entry_ttl, owner, dict(value))
+            self._owner_keys.setdefault(owner, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+        return True
+
+    def invalidate(self, key) -> None:
+        """Remove a single key from the cache."""
+        with self._lock:
+            self._epoch += 1
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_owner(self, owner: Any) -> None:
+        """Remove all keys that belong to `owner`."""
+        owner = str(owner)
+
+        with self._lock:
+            self._epoch += 1
+            for key in list(self._owner_keys.get(owner, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._owner_keys.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key) -> None:
+        """Remove a key and its owner index entry. Caller must hold the lock."""
+        _, owner, _ = self._entries.pop(key)
+
+        keys = self._owner_keys.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._owner_keys[owner]
+
+# Global singleton instance
+principal_cache = PrincipalCache(
+    max_size=PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=PRINCIPAL_CACHE_TTL,
+    enabled=PRINCIPAL_CACHE_ENABLED
+)
@@ -0,0 +1,210 @@
+"""
+Cross-worker cache invalidation via PostgreSQL LISTEN/NOTIFY.
+
+Triggers on the `users` schema send a notification for every change that
+affects authentication (see migration 3a7c9e1f2b4d). Each worker listens on
+a dedicated connection and evicts the affected entries from its local caches.
+"""
+
+# JSON and thread utilities
+import json
+import threading
+
+# Typing
+from typing import Callable, Optional
+
+# PostgreSQL connection pool (for the dedicated LISTEN connection)
+from api.database.postgres_pool import postgres_pool
+
+# Principal cache and API key filter
+from api.cache.principal_cache import principal_cache
+from api.cache.api_key_filter import api_key_filter
+
+# User database (API key filter refresh)
+from api.database.user_database.user_database import user_database
+
+# Logger
+from api.logger.logger import logger
+
+# Configuration
+from api.config.config import USER_CHANGE_LISTENER_RECONNECT_DELAY
+
+# Channel used by users.notify_user_change()
+USER_CHANGE_CHANNEL = "users_changed"
+
+class UserChangeListener:
+    """Background thread that dispatches user change notifications to handlers."""
+
+    def __init__(self, channel: str = USER_CHANGE_CHANNEL, reconnect_delay: float = 5.0):
+        """
+        Initialize the listener (not started).
+
+        Args:
+            channel: Notification channel to LISTEN on.
+            reconnect_delay: Delay between reconnect attempts (in seconds).
+        """
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+
+        self._handlers: list[Callable[[dict], None]] = []
+        self._reset_handlers: list[Callable[[], None]] = []
+        self._disconnect_handlers: list[Callable[[], None]] = []
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.connected = False
+        self.events_received = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+    def add_handler(self, handler: Callable[[dict], None]) -> None:
+        """
+        Register a handler for change events.
+
+        The handler receives the decoded payload:
+        {"table": <table name>, "op": <INSERT|UPDATE|DELETE>, "user_id": <uuid string>}
+        """
+        self._handlers.append(handler)
+
+    def add_reset_handler(self, handler: Callable[[], None]) -> None:
+        """
+        Register a handler that runs whenever the listener (re)connects.
+
+        Notifications sent while the listener was disconnected are lost, so
+        caches must drop everything they hold at this point.
+        """
+        self._reset_handlers.append(handler)
+
+    def add_disconnect_handler(self, handler: Callable[[], None]) -> None:
+        """
+        Register a handler that runs whenever the listener loses its connection.
+
+        Until the next reconnect no changes from other workers are received.
+        """
+        self._disconnect_handlers.append(handler)
+
+    def start(self) -> None:
+        """Start the listener thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        t = threading.Thread(target=self._run, daemon=True, name="user-change-listener")
+        self._thread = t
+        t.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the listener thread and wait for it to exit."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        """Return the listener state."""
+        return {
+            "running": self._thread is not None,
+            "connected": self.connected,
+            "events_received": self.events_received,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        """Listen loop with reconnect handling."""
+        while not self._stop.is_set():
+            try:
+                with postgres_pool.connect_dedicated(autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self.channel}")
+                    self.connected = True
+                    self._dispatch_reset()
+
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._dispatch(notify.payload)
+
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"User change listener disconnected: {e}")
+
+            finally:
+                if self.connected:
+                    self.reconnects += 1
+                self.connected = False
+                self._dispatch_disconnect()
+
+            self._stop.wait(max(0.5, float(self.reconnect_delay)))
+
+    def _dispatch(self, payload: str) -> None:
+        """Decode a notification payload and pass it to all handlers."""
+        self.events_received += 1
+
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed user change notification: {payload!r}")
+            return
+
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"User change handler failed: {e}")
+
+    def _dispatch_reset(self) -> None:
+        """Run all reset handlers."""
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"User change reset handler failed: {e}")
+
+    def _dispatch_disconnect(self) -> None:
+        """Run all disconnect handlers."""
+        for handler in self._disconnect_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"User change disconnect handler failed: {e}")
+
+# Global singleton instance
+user_change_listener = UserChangeListener(reconnect_delay=USER_CHANGE_LISTENER_RECONNECT_DELAY)
+
+def _rebuild_api_key_filter() -> None:
+    """Rebuild the API key filter from the database."""
+    count = api_key_filter.build(user_database.iter_api_key_hashes())
+    logger.info(f"API key filter rebuilt with {count} keys")
+
+def _sync_api_key_filter() -> None:
+    """Rebuild the API key filter after (re)connecting and let it reject keys again."""
+    _rebuild_api_key_filter()
+    api_key_filter.mark_synced(True)
+
+def _refresh_api_key_filter(event: dict) -> None:
+    """Add keys created by any worker to the filter and count replaced or revoked ones."""
+    if event.get("table") not in ("user_auth", "api_keys"):
+        return
+
+    if event["op"] in ("UPDATE", "DELETE"):
+        api_key_filter.discard()
+
+    if event["op"] in ("INSERT", "UPDATE"):
+        # Re-adding already known hashes of the user is harmless
+        for key_hash in user_database.get_api_key_hashes(event["user_id"]):
+            api_key_filter.add(key_hash)
+
+    if api_key_filter.needs_rebuild():
+        _rebuild_api_key_filter()
+
+# Evict cached principals of changed users
+user_change_listener.add_handler(lambda event: principal_cache.invalidate_owner(event["user_id"]))
+user_change_listener.add_reset_handler(principal_cache.clear)
+
+# Keep the API key filter in sync with keys created by other workers, it fails open while disconnected
+if api_key_filter.enabled:
+    user_change_listener.add_handler(_refresh_api_key_filter)
+    user_change_listener.add_reset_handler(_sync_api_key_filter)
+    user_change_listener.add_disconnect_handler(lambda: api_key_filter.mark_synced(False))
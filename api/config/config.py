@@ -45,6 +45,14 @@ API_DEFAULT_RATE_LIMITS = ["100/minute"] # Default rate limits
 # User configuration
 USERNAME_MIN_LENGTH = 4
 USERNAME_MAX_LENGTH = 12
+BULK_REGISTER_MAX_USERS = 10000 # Maximum number of users per bulk registration request
+API_KEYS_MAX_PER_USER = 10 # Maximum number of active (not revoked) additional API keys per user
+API_KEY_PREFIX_LENGTH = 12 # Length of the public key-id prefix of additional API keys (hex characters)
+API_KEY_ROTATION_GRACE_PERIOD = 86400.0 # Default time a rotated API key stays valid next to its replacement (in seconds)
+API_KEY_ROTATION_MAX_GRACE_PERIOD = 604800.0 # Maximum grace period a client can request when rotating a key (in seconds)
+BULK_PERM_UPDATE_MAX_USERS = 10000 # Maximum number of user_ids per bulk permission update request
+USER_EXPORT_BATCH_SIZE = 1000 # Rows fetched per round trip by the user export
+LEGACY_MIGRATION_BATCH_SIZE = 500 # Default number of legacy users imported per transaction (python -m api.database.legacy_migration)
 
 # PostgreSQL configuration
 # (Floats must stay as floats)
@@ -55,12 +63,46 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", None)  # Use None if not set
 POSTGRES_DATABASE = os.getenv("POSTGRES_DB", None)  # Use None if not set in .env to raise error later
 POSTGRES_MIN_CONNECTIONS = 1 # Minimum number of connections in the pool
 POSTGRES_MAX_CONNECTIONS = 5 # Maximum number of connections in the pool
+POSTGRES_ASYNC_MIN_CONNECTIONS = 1 # Minimum number of connections in the async pool (request path)
+POSTGRES_ASYNC_MAX_CONNECTIONS = 10 # Maximum number of connections in the async pool (request path)
 POSTGRES_CONNECT_TIMEOUT = 5.0 # Connection timeout for PostgreSQL (in seconds)
 POSTGRES_RETRIES = 2 # Number of retries for PostgreSQL connection
 POSTGRES_RETRY_DELAY = 2.0 # Delay between PostgreSQL connection retries (in seconds)
 POSTGRES_HEALTHCHECK_TIMEOUT = 15.0 # Timeout for PostgreSQL health checks (in seconds)
 POSTGRES_HEALTHCHECK_INTERVALL = 5.0 # Intervall time for PostgreSQL healthcheck (in seconds)
 
+# Principal cache configuration (API key -> user perm lookups)
+PRINCIPAL_CACHE_ENABLED = True # Cache resolved API keys in memory to skip database lookups
+PRINCIPAL_CACHE_MAX_SIZE = 10000 # Maximum number of cached API keys per worker
+PRINCIPAL_CACHE_TTL = 300.0 # Time a cached API key stays valid (in seconds)
+LEGACY_KEY_CACHE_ENABLED = True # Cache verified legacy API keys in memory to skip the PBKDF2 verification
+LEGACY_KEY_CACHE_MAX_SIZE = 1000 # Maximum number of cached legacy API keys per worker
+LEGACY_KEY_CACHE_TTL = 60.0 # Time a verified legacy API key stays cached (in seconds, also bounds changes made by other workers)
+LEGACY_SQLITE_BUSY_TIMEOUT = 5.0 # Time a legacy user store connection waits for a locked database (in seconds)
+LEGACY_SQLITE_CACHED_STATEMENTS = 128 # Number of prepared statements cached per legacy user store connection
+LEGACY_KEY_SCAN_ENABLED = True # Verify legacy keys stored before fingerprints existed by scanning them with PBKDF2 (disable once /api/legacy/admin/users/unfingerprinted is empty)
+LEGACY_KEY_SCAN_CONCURRENCY = 1 # Maximum number of concurrent scans per worker
+LEGACY_KEY_SCAN_TIMEOUT = 10.0 # Time a legacy key waits for a free scan slot before it is rejected (in seconds)
+API_KEY_FILTER_ENABLED = True # Reject unknown API keys with an in-memory bloom filter before any database access (requires USER_CHANGE_LISTENER_ENABLED)
+API_KEY_FILTER_CAPACITY = 100000 # Expected number of stored API keys (the filter grows automatically when exceeded)
+API_KEY_FILTER_FALSE_POSITIVE_RATE = 0.01 # Share of unknown keys that still reach the database
+API_KEY_FILTER_MISS_LOOKUPS_PER_SECOND = 20.0 # Filter misses per second and worker that are still checked in the database (covers keys just created by other workers)
+USER_CHANGE_LISTENER_ENABLED = True # LISTEN for user changes from other workers and evict them from local caches
+USER_CHANGE_LISTENER_RECONNECT_DELAY = 5.0 # Delay between reconnect attempts of the listener (in seconds)
+
+# Activity tracking
+LAST_LOGIN_TRACKING_ENABLED = True # Track the last authenticated request of every user in users.user.last_login
+LAST_LOGIN_FLUSH_INTERVAL = 60.0 # Intervall for writing tracked last_login values in one batch (in seconds)
+USER_PURGE_ENABLED = True # Permanently delete soft deleted users in the background after USER_PURGE_RETENTION
+USER_PURGE_RETENTION = 604800.0 # Time a deleted user can still be restored via /admin/users/{user_id}/restore (in seconds)
+USER_PURGE_INTERVAL = 300.0 # Intervall for checking for expired deleted users (in seconds)
+USER_PURGE_BATCH_SIZE = 100 # Maximum number of users purged per transaction
+USER_PURGE_BATCH_DELAY = 1.0 # Pause between two purge batches (in seconds)
+USER_PURGE_MAX_CPU_LOAD = 0.5 # Only purge while the last CPU load sample is below this value (0.0 - 1.0)
+AUDIT_LOG_ENABLED = True # Record user and permission changes in the audit.admin_events hypertable
+AUDIT_LOG_FLUSH_INTERVAL = 5.0 # Intervall for writing queued audit events in one batch (in seconds)
+AUDIT_LOG_MAX_QUEUE_SIZE = 100000 # Maximum number of queued audit events per worker (oldest events are dropped while the database is unreachable)
+
 # CORS configuration
 CORS_ALLOWED_ORIGINS = ["*"] # Allow all origins for now, can be adjusted later
 CORS_ALLOWED_METHODS = ["GET", "POST", "DELETE", "OPTIONS"] # Only allow specific methods, can be adjusted later
@@ -0,0 +1,174 @@
+"""Async PostgreSQL Connection Pool Manager.
+
+This module provides an asyncio connection pool for PostgreSQL using psycopg3.
+It is used on the request path so database latency does not block the event loop.
+The pool has to be opened from a running event loop (see the server lifespan).
+"""
+
+# Typing
+from typing import Optional
+
+# Psycopg3 rows and async connection pool
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+# Logger
+from api.logger.logger import log
+from logging import DEBUG, INFO, WARNING, CRITICAL
+
+# Sync pool (shares the background healthcheck)
+from api.database.postgres_pool import postgres_pool
+
+# PostgreSQL configuration
+from api.config.config import (
+    POSTGRES_HOST,
+    POSTGRES_PORT,
+    POSTGRES_USER,
+    POSTGRES_PASSWORD,
+    POSTGRES_DATABASE,
+    POSTGRES_ASYNC_MIN_CONNECTIONS,
+    POSTGRES_ASYNC_MAX_CONNECTIONS,
+    POSTGRES_CONNECT_TIMEOUT,
+    POSTGRES_HEALTHCHECK_TIMEOUT
+)
+
+class AsyncPostgresPool:
+    """Singleton async connection pool for PostgreSQL."""
+
+    _instance: Optional['AsyncPostgresPool'] = None
+    _pool: Optional[AsyncConnectionPool] = None
+
+    def __new__(cls):
+        """
+        Create or return the singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    async def open(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        min_size: int = 2,
+        max_size: int = 10,
+        connect_timeout: float = 5.0,
+        healthcheck_timeout: float | None = None,
+    ) -> bool:
+        """Open the async connection pool.
+
+        Args:
+            host: PostgreSQL host
+            port: PostgreSQL port
+            user: Database user
+            password: Database password
+            database: Database name
+            min_size: Minimum pool size
+            max_size: Maximum pool size
+            connect_timeout: psycopg connection timeout (seconds)
+            healthcheck_timeout: Time to wait for pool warm-up/first connection
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self._pool is not None:
+            log(DEBUG, "Async connection pool already initialized")
+            return True
+
+        timeout_s = max(1, int(connect_timeout))
+        conninfo = (
+            f"host={host} port={port} user={user} password={password} "
+            f"dbname={database} sslmode=prefer connect_timeout={timeout_s}"
+        )
+
+        pool: Optional[AsyncConnectionPool] = None
+
+        try:
+            pool = AsyncConnectionPool(
+                conninfo,
+                min_size=min_size,
+                max_size=max_size,
+                kwargs={"row_factory": dict_row},
+                open=False,
+            )
+            await pool.open(wait=bool(healthcheck_timeout), timeout=healthcheck_timeout or 30.0)
+            self._pool = pool
+
+            log(
+                INFO,
+                f"Async PostgreSQL connection pool initialized: {database}@{host}:{port} "
+                f"(pool size: {min_size}-{max_size}, timeout={timeout_s}s)",
+            )
+            return True
+
+        except Exception as exc:
+            log(CRITICAL, f"Failed to initialize async PostgreSQL connection pool: {exc}")
+            if pool is not None:
+                try:
+                    await pool.close()
+                except Exception:
+                    pass
+            return False
+
+    def get_connection(self):
+        """Get a connection from the pool.
+
+        Returns:
+            An async context manager for a database connection.
+
+        Raises:
+            RuntimeError: If pool is not initialized
+        """
+        if self._pool is None:
+            raise RuntimeError("Async connection pool not initialized. Call open() first.")
+        return self._pool.connection()
+
+    def is_ready(self) -> bool:
+        """
+        Return whether the pool is open and the database is reported as ready.
+
+        Readiness of the server itself is taken from the background
+        healthcheck of the sync pool, both pools talk to the same database.
+        """
+        return self._pool is not None and postgres_pool.is_ready()
+
+    async def close(self, silent: bool = False):
+        """
+        Close the connection pool.
+        Args:
+            silent: If True, suppress log messages.
+        """
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            if not silent:
+                log(INFO, "Async PostgreSQL connection pool closed")
+
+    def stats(self) -> dict:
+        """Return psycopg_pool statistics (empty if the pool is closed)."""
+        if self._pool is None:
+            return {}
+        return self._pool.get_stats()
+
+
+# Global singleton instance
+async_postgres_pool = AsyncPostgresPool()
+
+async def open_async_postgres_pool() -> bool:
+    """Open the global async pool with the configured credentials."""
+    opened = await async_postgres_pool.open(host=POSTGRES_HOST,
+                                            port=POSTGRES_PORT,
+                                            user=POSTGRES_USER,
+                                            password=POSTGRES_PASSWORD,
+                                            database=POSTGRES_DATABASE,
+                                            min_size=POSTGRES_ASYNC_MIN_CONNECTIONS,
+                                            max_size=POSTGRES_ASYNC_MAX_CONNECTIONS,
+                                            connect_timeout=POSTGRES_CONNECT_TIMEOUT,
+                                            healthcheck_timeout=POSTGRES_HEALTHCHECK_TIMEOUT
+                                            )
+    if not opened:
+        log(WARNING, "Async user database is unavailable until the async pool can be opened")
+    return opened
@@ -0,0 +1,186 @@
+"""
+The main module for audit log database operations.
+"""
+
+# Import async PostgreSQL connection pool
+from api.database.async_postgres_pool import async_postgres_pool
+
+from api.database.migrate import migration_needed
+
+# Import psycopg DictCursor and JSON adapter
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+# Import cursor encoding utilities
+from api.utils.cursor import encode_cursor, decode_cursor
+
+# Import logger
+from api.logger.logger import logger
+
+from api.exceptions.exceptions import *
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+class AuditDatabase:
+    """Class to handle audit log database operations"""
+
+    def __init__(self):
+        """Initialize the audit database connection."""
+        self._ready = False
+        self.schema = "audit"
+
+    def init_db(self) -> bool:
+        """
+        Initialize the readiness state for the audit database.
+
+        This checks whether a migration is needed and sets the internal
+        `_ready` flag accordingly.
+
+        Returns:
+            bool: True if the database is up-to-date (no migration needed),
+            False otherwise.
+        """
+        self._ready = not migration_needed()
+        return self._ready
+
+    async def insert_events(self, events: list) -> int:
+        """
+        Insert a batch of audit events with COPY.
+
+        Args:
+            events: List of (time, actor_user_id, action, target_user_id, details) tuples.
+
+        Returns:
+            int: Number of inserted events.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    async with cur.copy(
+                        f"COPY {self.schema}.admin_events (time, actor_user_id, action, target_user_id, details) FROM STDIN"
+                    ) as copy:
+                        copy.set_types(["timestamptz", "uuid", "text", "uuid", "jsonb"])
+                        for time, actor_user_id, action, target_user_id, details in events:
+                            await copy.write_row((
+                                time,
+                                actor_user_id,
+                                action,
+                                target_user_id,
+                                Jsonb(details) if details is not None else None
+                            ))
+
+                await conn.commit()
+                return len(events)
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Unexpected error while inserting audit events: {e}")
+                raise
+
+    async def get_events(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        action: Optional[str] = None,
+        actor_user_id: Optional[str] = None,
+        target_user_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> tuple:
+        """
+        Fetch audit events, newest first, with optional filters.
+
+        Pagination uses a keyset on `(time, event_id)`, so every page has the
+        same cost and events with equal timestamps are never skipped.
+
+        Args:
+            start: start time (inclusive)
+            end: end time (inclusive)
+            action: filter by action
+            actor_user_id: filter by the user that performed the action
+            target_user_id: filter by the affected user
+            limit: max rows to return
+            cursor: Opaque cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of events, next cursor or None on the last page)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        query = f"""
+            SELECT time, event_id, actor_user_id, action, target_user_id, details
+            FROM {self.schema}.admin_events
+            WHERE 1=1
+        """
+
+        params = []
+
+        if start:
+            query += " AND time >= %s"
+            params.append(start)
+
+        if end:
+            query += " AND time <= %s"
+            params.append(end)
+
+        if action:
+            query += " AND action = %s"
+            params.append(action)
+
+        if actor_user_id:
+            query += " AND actor_user_id = %s"
+            params.append(actor_user_id)
+
+        if target_user_id:
+            query += " AND target_user_id = %s"
+            params.append(target_user_id)
+
+        if cursor:
+            time, event_id = decode_cursor(cursor, length=2)
+            try:
+                time = datetime.fromisoformat(time)
+                event_id = uuid.UUID(event_id)
+            except (TypeError, ValueError):
+                raise InvalidCursorError("Cursor contains invalid values")
+
+            query += " AND (time, event_id) < (%s, %s)"
+            params.extend([time, event_id])
+
+        query += """
+            ORDER BY time DESC, event_id DESC
+            LIMIT %s
+        """
+        params.append(limit + 1)
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(query, params)
+                    rows = await cur.fetchall()
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Unexpected error while fetching audit events: {e}")
+                raise
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["time"].isoformat(), str(last["event_id"]))
+
+        return rows, next_cursor
+
+    def is_ready(self) -> bool:
+        """
+        Check if the audit database is initialized and ready.
+        Returns:
+            True if the database is ready, False otherwise.
+        """
+        return self._ready and async_postgres_pool.is_ready()
+
+# Global singleton instance
+audit_database = AuditDatabase()
@@ -0,0 +1,171 @@
+"""
+Migrate users from the legacy SQLite store (`users.db`) to the v1 PostgreSQL schema.
+
+Usage:
+    python -m api.database.legacy_migration --legacy-db users.db --keys-file migrated_keys.csv
+
+Rows are streamed out of the legacy `users` table in username order and
+imported batch by batch (COPY + one CTE per batch, see
+`UserDatabase.import_legacy_users`). Legacy keys are PBKDF2 hashes that can
+not be converted, so every imported user gets a new API key. The new keys
+are appended to `--keys-file` before the batch is committed, hand them out
+to the account owners and delete the file afterwards.
+
+The migration is idempotent: users imported by an earlier run are skipped,
+so an interrupted run can simply be started again (or continued with
+`--start-after <last reported username>`). Legacy users whose sanitized
+username is already taken by another account are not imported, they are
+reported one by one and the tool exits with status 1.
+"""
+
+# Standard library
+import os
+import csv
+import sqlite3
+import argparse
+from datetime import datetime
+
+# User database
+from api.database.user_database.user_database import user_database
+
+# Logger
+from api.logger.logger import logger
+
+# Configuration
+from api.config.config import LEGACY_MIGRATION_BATCH_SIZE
+
+KEYS_FILE_FIELDS = ["legacy_username", "username", "user_id", "api_key"]
+
+def iter_legacy_batches(db_path: str, batch_size: int, start_after: str = ""):
+    """
+    Yield batches of legacy users as dicts for `import_legacy_users`.
+
+    Uses keyset pagination on the username (primary key), so memory use is
+    bounded by the batch size and the legacy database is only read.
+
+    Args:
+        db_path: Path to the legacy SQLite database.
+        batch_size: Number of users per batch.
+        start_after: Only users with a greater username are returned.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    try:
+        last_username = start_after
+
+        while True:
+            rows = conn.execute(
+                """
+                SELECT username, role, created_at, last_login, is_active
+                FROM users
+                WHERE username > ?
+                ORDER BY username
+                LIMIT ?
+                """,
+                (last_username, batch_size)
+            ).fetchall()
+
+            if not rows:
+                return
+
+            yield [
+                {
+                    "username": username,
+                    "is_admin": role == "admin",
+                    "activated": bool(is_active),
+                    "created_at": datetime.fromisoformat(created_at) if created_at else None,
+                    "last_login": datetime.fromisoformat(last_login) if last_login else None,
+                }
+                for username, role, created_at, last_login, is_active in rows
+            ]
+
+            last_username = rows[-1][0]
+
+    finally:
+        conn.close()
+
+def open_keys_file(path: str):
+    """Open the keys file for appending (owner read/write only) and write the header if it is new."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    keys_file = os.fdopen(fd, "a", newline="")
+
+    writer = csv.DictWriter(keys_file, fieldnames=KEYS_FILE_FIELDS, extrasaction="ignore")
+    if keys_file.tell() == 0:
+        writer.writeheader()
+
+    return keys_file, writer
+
+def migrate_legacy_users(db_path: str, keys_file_path: str, batch_size: int = 500, start_after: str = "") -> dict:
+    """
+    Migrate all legacy users to PostgreSQL.
+
+    Args:
+        db_path: Path to the legacy SQLite database.
+        keys_file_path: CSV file the new API keys are appended to.
+        batch_size: Number of users per transaction.
+        start_after: Resume after this legacy username.
+
+    Returns:
+        dict: Number of users per result status.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Legacy database not found: {db_path}")
+
+    totals = {"created": 0, "exists": 0, "conflict": 0, "duplicate": 0, "invalid": 0}
+    keys_file, writer = open_keys_file(keys_file_path)
+
+    def persist_keys(created: list) -> None:
+        # Runs before the batch is committed, a crash can never lose keys of created users.
+        # If the commit fails afterwards the rows are re-imported with new keys, the last line per username wins.
+        writer.writerows(created)
+        keys_file.flush()
+        os.fsync(keys_file.fileno())
+
+    try:
+        for batch in iter_legacy_batches(db_path=db_path, batch_size=batch_size, start_after=start_after):
+            results = user_database.import_legacy_users(users=batch, on_created=persist_keys)
+
+            for result in results:
+                totals[result["status"]] += 1
+                if result["status"] == "invalid":
+                    logger.warning(f"Skipped legacy user with invalid username: {result['legacy_username']!r}")
+                elif result["status"] == "conflict":
+                    logger.warning(f"Skipped legacy user {result['legacy_username']!r}: username {result['username']!r} is taken by {result['conflict_with']!r}")
+                elif result["status"] == "duplicate":
+                    logger.warning(f"Skipped legacy user {result['legacy_username']!r}: username {result['username']!r} is also used by legacy user {result['conflict_with']!r}")
+
+            logger.info(f"Migrated legacy users up to {batch[-1]['username']!r} ({totals})")
+
+    finally:
+        keys_file.close()
+
+    return totals
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate legacy SQLite users to the v1 PostgreSQL schema.")
+    parser.add_argument("--legacy-db", default="users.db", help="Path to the legacy SQLite database")
+    parser.add_argument("--keys-file", required=True, help="CSV file the new API keys are appended to")
+    parser.add_argument("--batch-size", type=int, default=LEGACY_MIGRATION_BATCH_SIZE, help="Users per transaction")
+    parser.add_argument("--start-after", default="", help="Resume after this legacy username")
+    args = parser.parse_args()
+
+    if not user_database.init_db():
+        raise SystemExit("Database schema is not up to date, run the Alembic migrations first")
+
+    totals = migrate_legacy_users(
+        db_path=args.legacy_db,
+        keys_file_path=args.keys_file,
+        batch_size=max(1, args.batch_size),
+        start_after=args.start_after
+    )
+
+    print(f"Legacy migration finished: {totals}")
+    print(f"New API keys were written to {args.keys_file}")
+
+    not_migrated = totals["conflict"] + totals["duplicate"] + totals["invalid"]
+    if not_migrated:
+        print(f"{not_migrated} legacy users were not migrated, see the log for their usernames")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
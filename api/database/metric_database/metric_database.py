@@ -266,6 +266,108 @@ class MetricDatabase:
                 logger.error(f"Unexpected error while fetching global metrics: {e}")
                 raise
 
+    def insert_user_usage(self, user_rows: list):
+        if not user_rows:
+            return
+
+        with postgres_pool.get_connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    # Several workers flush the same minute bucket, add up instead of failing on the primary key
+                    cur.executemany(f"""
+                        INSERT INTO {self.schema}.user_usage
+                        VALUES (%s,%s,%s,%s,%s,%s)
+                        ON CONFLICT (time, user_id) DO UPDATE SET
+                            requests = user_usage.requests + EXCLUDED.requests,
+                            errors = user_usage.errors + EXCLUDED.errors,
+                            total_response_time = user_usage.total_response_time + EXCLUDED.total_response_time,
+                            response_bytes = user_usage.response_bytes + EXCLUDED.response_bytes
+                    """, user_rows)
+
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Unexpected error while inserting user usage metrics: {e}")
+                raise
+
+    def get_top_consumers(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        order_by: str = "requests",
+        limit: int = 10,
+    ):
+        """
+        Return the users with the highest usage in a time range.
+
+        Args:
+            start: start time (inclusive)
+            end: end time (inclusive)
+            order_by: requests, errors, response_time or response_bytes
+            limit: max users to return
+
+        Returns:
+            list[dict]: user_id, username and the summed usage per user
+        """
+        order_columns = {
+            "requests": "requests",
+            "errors": "errors",
+            "response_time": "total_response_time",
+            "response_bytes": "response_bytes",
+        }
+        order_column = order_columns[order_by]
+
+        query = f"""
+            WITH usage AS (
+                SELECT
+                    user_id,
+                    SUM(requests) AS requests,
+                    SUM(errors) AS errors,
+                    SUM(total_response_time) AS total_response_time,
+                    SUM(response_bytes) AS response_bytes
+                FROM {self.schema}.user_usage
+                WHERE 1=1
+        """
+
+        params = []
+
+        if start:
+            query += " AND time >= %s"
+            params.append(start)
+
+        if end:
+            query += " AND time <= %s"
+            params.append(end)
+
+        query += f"""
+                GROUP BY user_id
+                ORDER BY {order_column} DESC
+                LIMIT %s
+            )
+            SELECT
+                usage.user_id,
+                u.username,
+                usage.requests,
+                usage.errors,
+                usage.total_response_time,
+                usage.total_response_time / NULLIF(usage.requests, 0) AS avg_response_time,
+                usage.response_bytes
+            FROM usage
+            LEFT JOIN users.user u ON u.user_id = usage.user_id
+            ORDER BY usage.{order_column} DESC
+        """
+        params.append(limit)
+
+        with postgres_pool.get_connection() as conn:
+            try:
+                with conn.cursor(row_factory=dict_row) as cur:
+                    cur.execute(query, params)
+                    return cur.fetchall()
+
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Unexpected error while fetching top consumers: {e}")
+                raise
+
     def is_ready(self) -> bool:
         """
         Check if the user database is initialized and ready.
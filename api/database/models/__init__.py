@@ -1,3 +1,4 @@
-from .user import User, UserAuth, UserPerm
+from .user import User, UserAuth, UserPerm, UserCounters, ApiKey
 from .migration_log import MigrationLog
-from .metrics import RouteMetrics, RouteStatusCodes, GlobalMetrics
\ No newline at end of file
+from .metrics import RouteMetrics, RouteStatusCodes, GlobalMetrics, UserUsage
+from .audit import AdminAuditEvent
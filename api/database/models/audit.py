@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from .base import Base
+
+SCHEMA = "audit"
+
+class AdminAuditEvent(Base):
+    """ORM model for audit log entries of user and permission changes (TimescaleDB hypertable)."""
+    __tablename__ = "admin_events"
+    __table_args__ = (
+        Index("idx_admin_events_action_time", "action", text("time DESC")),
+        Index("idx_admin_events_actor_time", "actor_user_id", text("time DESC")),
+        Index("idx_admin_events_target_time", "target_user_id", text("time DESC")),
+        {"schema": SCHEMA}
+    )
+    time = Column(DateTime(timezone=True), nullable=False, primary_key=True)
+    event_id = Column(UUID(as_uuid=True), server_default=text("gen_random_uuid()"), primary_key=True)
+    actor_user_id = Column(UUID(as_uuid=True))
+    action = Column(String, nullable=False)
+    target_user_id = Column(UUID(as_uuid=True))
+    details = Column(JSONB)
+
+# Hypertable and indexes defined in:
+# - d3a9f6b2c4e8_add_admin_audit_log
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Integer, Float, text
+from sqlalchemy import Column, String, DateTime, Integer, Float, BigInteger, Index, text
+from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 
 SCHEMA = "metrics"
@@ -30,4 +31,17 @@ class GlobalMetrics(Base):
     time = Column(DateTime, primary_key=True)
     total_requests = Column(Integer)
     avg_response_time = Column(Float)
-    error_rate = Column(Float)
\ No newline at end of file
+    error_rate = Column(Float)
+
+class UserUsage(Base):
+    __tablename__ = "user_usage"
+    __table_args__ = (
+        Index("idx_user_usage_user_time", "user_id", text("time DESC")),
+        {"schema": SCHEMA}
+    )
+    time = Column(DateTime, nullable=False, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, primary_key=True)
+    requests = Column(Integer, nullable=False)
+    errors = Column(Integer, nullable=False)
+    total_response_time = Column(Float, nullable=False)
+    response_bytes = Column(BigInteger, nullable=False)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, func, Boolean, ForeignKey, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, func, Boolean, ForeignKey, BigInteger, CheckConstraint, LargeBinary, Index, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from .base import Base
 
 SCHEMA = "users"
@@ -8,7 +8,8 @@ class User(Base):
     """
     ORM model for the primary `user` table.
 
-    Contains fields for username, creation time, last login and immutability flag.
+    Contains fields for username, creation time, last login, immutability flag
+    and the legacy username of imported users.
     """
     __tablename__ = "user"
     __table_args__ = {"schema": SCHEMA}
@@ -17,23 +18,31 @@ class User(Base):
     created_at = Column(DateTime, server_default=func.now())
     last_login = Column(DateTime)
     immutable = Column(Boolean, nullable=False, server_default=text("false"))
+    legacy_username = Column(String, unique=True) # Set for users imported from the legacy SQLite store
 
 class UserAuth(Base):
-    """ORM model for storing API key hashes for users."""
+    """ORM model for storing API key hashes (raw HMAC-SHA256 digests) for users."""
     __tablename__ = "user_auth"
-    __table_args__ = {"schema": SCHEMA}
+    __table_args__ = (
+        ExcludeConstraint(("api_key_hash", "="), using="hash", name="user_auth_api_key_hash_excl"),
+        {"schema": SCHEMA}
+    )
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.user.user_id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False
     )
-    api_key_hash = Column(String, nullable=True, unique=True)
+    api_key_hash = Column(LargeBinary, nullable=True)
+    api_key_expires_at = Column(DateTime) # Set while a rotated key is in its grace window
 
 class UserPerm(Base):
-    """ORM model for user permission flags (admin, activated)."""
+    """ORM model for user permission flags (admin, activated) and the soft delete marker."""
     __tablename__ = "user_perm"
-    __table_args__ = {"schema": SCHEMA}
+    __table_args__ = (
+        Index("idx_user_perm_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        {"schema": SCHEMA}
+    )
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.user.user_id", ondelete="CASCADE"),
@@ -42,15 +51,72 @@ class UserPerm(Base):
     )
     is_admin = Column(Boolean, server_default=text("false"))
     activated = Column(Boolean, server_default=text("false"))
+    deleted_at = Column(DateTime) # Soft deleted (purged by the purge worker after the retention window)
 
 
+class ApiKey(Base):
+    """ORM model for additional API keys of a user (`<key_prefix>.<secret>`)."""
+    __tablename__ = "api_keys"
+    __table_args__ = (
+        Index("idx_api_keys_user_id_created_at", "user_id", text("created_at DESC")),
+        {"schema": SCHEMA}
+    )
+    key_id = Column(UUID(as_uuid=True), server_default=text("gen_random_uuid()"), primary_key=True)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.user.user_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    key_prefix = Column(String, nullable=False, unique=True)
+    key_hash = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_used_at = Column(DateTime)
+    revoked = Column(Boolean, nullable=False, server_default=text("false"))
+    expires_at = Column(DateTime) # Set while a rotated key is in its grace window
+
+class UserCounters(Base):
+    """ORM model for the single row table with user totals (maintained by triggers)."""
+    __tablename__ = "user_counters"
+    __table_args__ = (CheckConstraint("id"), {"schema": SCHEMA})
+    id = Column(Boolean, primary_key=True, server_default=text("true"))
+    total_users = Column(BigInteger, nullable=False, server_default=text("0"))
+    activated_users = Column(BigInteger, nullable=False, server_default=text("0"))
+    active_admins = Column(BigInteger, nullable=False, server_default=text("0"))
+
 # Relationships defined in:
 # - f84c0e0cdb7e_fixed_error_with_user_child_creation_in_
 # - 37abce9a74cb_fixed_missing_relationships_table_
+# - 5d2a8f6c1e07_skip_existing_user_children
 
 # Immutable users/functions defined in:
 # - 29d2e30dee1b_added_immutable_column
 # - e6519d238a1b_added_immutable_user_functions
 # - c37fe0d02922_make_first_admin_immutable_by_default
 # - a2660751bd38_fix_for_non_immutable_user_deletion
-# - 5441ed5a5756_fix_for_database_error_when_loading_
\ No newline at end of file
+# - 5441ed5a5756_fix_for_database_error_when_loading_
+# - 7b1e4d2c9a30_allow_last_login_update_on_immutable
+
+# Change notifications (LISTEN/NOTIFY cache invalidation) defined in:
+# - 3a7c9e1f2b4d_add_user_change_notify_triggers
+# - b4e7a2c9d1f6_add_api_keys_table
+# - c8f1e3a5b7d2_add_api_key_expiry
+
+# Indexes defined in:
+# - 9c4e2b7a1d53_add_user_keyset_pagination_index
+# - 2e8b5f3a9c61_add_username_search_indexes
+
+# Counters (user_counters table and triggers) defined in:
+# - 6f3d9a2b8e14_add_user_counters
+
+# API key hash storage (bytea, hash index) defined in:
+# - 8a5c1d7e3f92_store_api_key_hash_as_bytea
+
+# API keys (multiple keys per user) defined in:
+# - b4e7a2c9d1f6_add_api_keys_table
+# - c8f1e3a5b7d2_add_api_key_expiry
+
+# Soft delete (user_perm.deleted_at, counters and purge index) defined in:
+# - e1f4a7c3b9d6_add_user_soft_delete
+
+# Legacy import marker (user.legacy_username) defined in:
+# - a7d3c5e9f1b4_add_legacy_username
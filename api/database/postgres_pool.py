@@ -11,6 +11,7 @@ import threading
 from typing import Optional
 
 # Psycopg3 rows and connection pool
+import psycopg
 from psycopg.rows import dict_row
 from psycopg_pool import ConnectionPool
 
@@ -61,6 +62,7 @@ class PostgresPool:
         self._monitor_thread: Optional["threading.Thread"] = None
         self._monitor_stop = False
         self._lock = threading.Lock()
+        self._conninfo: Optional[str] = None
     
     def init_pool(
         self,
@@ -106,6 +108,7 @@ class PostgresPool:
             f"host={host} port={port} user={user} password={password} "
             f"dbname={database} sslmode=prefer connect_timeout={timeout_s}"
         )
+        self._conninfo = conninfo
 
         for attempt in range(1, attempts + 1):
             try:
@@ -159,6 +162,26 @@ class PostgresPool:
             raise RuntimeError("Connection pool not initialized. Call init_pool() first.")
         return self._pool.connection()
 
+    def connect_dedicated(self, autocommit: bool = True) -> psycopg.Connection:
+        """Open a connection outside of the pool.
+
+        Used for long-lived sessions (e.g. LISTEN) that would otherwise
+        block a pooled connection forever. The caller is responsible for
+        closing the connection.
+
+        Args:
+            autocommit: Open the connection in autocommit mode
+
+        Returns:
+            A new psycopg connection using the pool's credentials.
+
+        Raises:
+            RuntimeError: If pool is not initialized
+        """
+        if self._conninfo is None:
+            raise RuntimeError("Connection pool not initialized. Call init_pool() first.")
+        return psycopg.connect(self._conninfo, autocommit=autocommit, row_factory=dict_row)
+
     def is_ready(self) -> bool:
         """Return whether the pool currently reports the database as ready."""
         with self._lock:
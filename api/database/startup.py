@@ -10,7 +10,9 @@ from api.database.backup import backup_database
 from api.database.migrate import migration_needed, run_alembic_upgrade_head
 
 from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
 from api.database.metric_database.metric_database import metric_database
+from api.database.audit_database.audit_database import audit_database
 
 import os
 from dotenv import load_dotenv
@@ -27,7 +29,7 @@ def startup_database():
     - Optionally create a backup
     - Run pending alembic migrations if enabled
     - Optionally flush demo database
-    - Initialize the application `user_database` readiness state
+    - Initialize the readiness state of `user_database`, `async_user_database` and `audit_database`
     """
     needs_migration = migration_needed()
 
@@ -47,9 +49,15 @@ def startup_database():
 
         # Set user database to ready when everything worked
         user_database.init_db()
+        async_user_database.init_db()
 
         # Set metric database to ready when everything worked
         metric_database.init_db()
 
+        # Set audit database to ready when everything worked
+        audit_database.init_db()
+
+        # The API key filter is built by the user change listener once it is connected
+
     except Exception:
         pass
\ No newline at end of file
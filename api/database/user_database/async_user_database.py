@@ -0,0 +1,1490 @@
+"""
+Async implementation of the user database.
+
+Used on the request path (v1 routers and authentication) so that database
+latency does not block the event loop. The sync `UserDatabase` stays
+available for startup tasks and scripts.
+"""
+
+# Import UUID generation and datetime parsing
+import uuid
+from datetime import datetime
+
+# Import constant time comparison
+import hmac
+
+# Import psycopg errors
+from psycopg.errors import UniqueViolation
+
+# Import psycopg DictCursor
+from psycopg.rows import dict_row
+
+# Import logger
+from api.logger.logger import logger
+
+# Import async PostgreSQL connection pool
+from api.database.async_postgres_pool import async_postgres_pool
+
+# Import shared user database helpers
+from api.database.user_database.base_user_database import BaseUserDatabase
+
+# Import principal cache and API key filter
+from api.cache.principal_cache import principal_cache
+from api.cache.api_key_filter import api_key_filter
+
+from api.exceptions.exceptions import *
+
+class AsyncUserDatabase(BaseUserDatabase):
+    """Class to handle user database operations on the async connection pool."""
+
+    async def _create_user_records(self, username: str, hashed_api_key: bytes, is_admin: bool, activate: bool, immutable: bool = False) -> str:
+        """
+        Create the user, auth and perm records of a new user in a single statement.
+
+        The records are inserted by one CTE in one transaction, so a failure
+        never leaves a half-created user behind. The child rows normally
+        created by `users.create_user_children()` already exist at that point
+        and are skipped by the trigger (see migration 5d2a8f6c1e07).
+
+        Args:
+            username: The (sanitized) username to store.
+            hashed_api_key: The hash of the new API key.
+            is_admin: Whether the new user should have admin privileges.
+            activate: Whether the new user should be marked as activated.
+            immutable: Whether the new user should be immutable.
+
+        Returns:
+            The generated user_id of the newly created user.
+
+        Raises:
+            UniqueViolation:
+                If the username already exists.
+            UserRecordCreationError:
+                If no user_id is returned or an unexpected database error occurs.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        WITH new_user AS (
+                            INSERT INTO {self.schema}.user (username, immutable)
+                            VALUES (%s, %s)
+                            RETURNING user_id
+                        ),
+                        new_auth AS (
+                            INSERT INTO {self.schema}.user_auth (user_id, api_key_hash)
+                            SELECT user_id, %s FROM new_user
+                        ),
+                        new_perm AS (
+                            INSERT INTO {self.schema}.user_perm (user_id, is_admin, activated)
+                            SELECT user_id, %s, %s FROM new_user
+                        )
+                        SELECT user_id FROM new_user;
+                        """,
+                        (username, immutable, hashed_api_key, is_admin, activate)
+                    )
+
+                    row = (await cur.fetchone())
+
+                if not row or not row["user_id"]:
+                    raise UserRecordCreationError("No user_id returned while creating user records")
+
+                await conn.commit()
+                api_key_filter.add(hashed_api_key)
+                return row["user_id"]
+
+            except (UniqueViolation, UserRecordCreationError):
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                logger.error(f"Error creating account: {e}")
+                await conn.rollback()
+                raise UserRecordCreationError("Unexpected error while creating user records")
+
+    async def _get_user_record(self, user_id: str) -> dict:
+        """
+        Load a single user record from the database by user_id.
+
+        Args:
+            user_id: The unique identifier of the user to load
+
+        Returns:
+            A dictionary containing the full user record columns and values.
+
+        Raises:
+            UserNotFoundError:
+                If no user record exists for the given user_id.
+            UserrecordReadError:
+                If a database or query error occurs while reading the record.
+        """
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        SELECT * FROM {self.schema}.user u
+                        WHERE u.user_id = %s
+                            AND NOT EXISTS (
+                                SELECT 1 FROM {self.schema}.user_perm p
+                                WHERE p.user_id = u.user_id AND p.deleted_at IS NOT NULL
+                            )
+                        """,
+                        (user_id,)
+                    )
+                    
+                    user = await cur.fetchone()
+                    if user:
+                        return user
+                    else:
+                        raise UserNotFoundError(f"User record for user_id {user_id} could not be loaded")
+
+            except UserNotFoundError:
+                raise
+
+            except Exception as e:
+                logger.error(f"Error getting user record: {e}")
+                raise UserRecordReadError(f"User record for user_id {user_id} could not be read")
+
+    async def _get_user_perm_record(self, user_id: str) -> dict:
+        """
+        Load the perm record for a user from the database.
+
+        Args:
+            user_id: The unique identifier of the user whose perm record shuld be loaded.
+
+        Returns:
+            A dictionary containing the user permission fields and values.
+
+        Raises:
+            UserNotFoundError:
+                If no perm record exists for the given user_id.
+            UserPermReadError:
+                If an unexpected database error occurs while reading user perm.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        SELECT * FROM {self.schema}.user_perm WHERE user_id = %s AND deleted_at IS NULL
+                        """,
+                        (user_id,)
+                    )
+
+                    user_perm = await cur.fetchone()
+                if user_perm:
+                    return user_perm
+                else:
+                    raise UserNotFoundError(f"User perm record for {('user_id ' + str(user_id)) if user_id else 'api_key_hash'} could not be loaded")
+
+            except UserNotFoundError:
+                raise
+
+            except Exception as e:
+                logger.error(f"Error getting user perm record: {e}")
+                raise UserPermReadError(f"User perm for user_id {user_id} could not be read")
+
+    async def create_user(self, username: str, is_admin: bool, activate: bool, _immutable: bool = False) -> tuple:
+        """
+        Create a complete user including base record, auth data and permissions.
+
+        Args:
+            username: The requested username (will be sanitized before storage).
+            is_admin: Whether the new user should have admin privileges.
+            activate: Whether the new user should be marked as activated.
+
+        Returns:
+            A tuple of (sanitized_username, user_id, api_key)
+
+        Raises:
+            UniqueViolation:
+                If the username is already taken.
+            KeyHashError:
+                If the generated API key could not be hashed.
+            UserRecordCreationError:
+                If the user records could not be created.
+        """
+        sanitized_username = self._sanitize_username(username=username)
+
+        api_key = self._generate_api_key()
+        hashed_api_key = self._hash_api_key(api_key=api_key)
+
+        user_id = await self._create_user_records(
+            username=sanitized_username,
+            hashed_api_key=hashed_api_key,
+            is_admin=is_admin,
+            activate=activate,
+            immutable=_immutable
+        )
+
+        return sanitized_username, user_id, api_key
+
+    async def bulk_create_users(self, users: list) -> list:
+        """
+        Create many users in one transaction.
+
+        Keys are generated and hashed in the application, the rows are loaded
+        into a temporary staging table with COPY and moved into the user, auth
+        and perm tables by a single CTE. Usernames that already exist are
+        skipped instead of failing the whole batch.
+
+        Args:
+            users: List of dicts with `username`, `is_admin` and `activate`.
+
+        Returns:
+            A list with one result dict per requested user (same order). Each
+            result has a `status` of `created`, `exists`, `duplicate` or
+            `invalid`. Created users also contain `user_id` and `api_key`.
+
+        Raises:
+            KeyHashError:
+                If an API key could not be hashed.
+            UserRecordCreationError:
+                If an unexpected database error occurs (nothing is created).
+        """
+        results = []
+        staged = [] # (user_id, username, api_key_hash, is_admin, activated)
+        seen = set()
+
+        for user in users:
+            username = self._sanitize_username(username=user["username"])
+
+            if not username:
+                results.append({"username": user["username"], "status": "invalid"})
+                continue
+
+            if username in seen:
+                results.append({"username": username, "status": "duplicate"})
+                continue
+
+            seen.add(username)
+
+            user_id = uuid.uuid4()
+            api_key = self._generate_api_key()
+            hashed_api_key = self._hash_api_key(api_key=api_key)
+
+            staged.append((user_id, username, hashed_api_key, user["is_admin"], user["activate"]))
+            results.append({"username": username, "user_id": str(user_id), "api_key": api_key, "status": None})
+
+        if not staged:
+            return results
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        """
+                        CREATE TEMP TABLE bulk_users (
+                            user_id UUID,
+                            username TEXT,
+                            api_key_hash BYTEA,
+                            is_admin BOOLEAN,
+                            activated BOOLEAN
+                        ) ON COMMIT DROP;
+                        """
+                    )
+
+                    async with cur.copy(
+                        "COPY bulk_users (user_id, username, api_key_hash, is_admin, activated) FROM STDIN"
+                    ) as copy:
+                        copy.set_types(["uuid", "text", "bytea", "bool", "bool"])
+                        for row in staged:
+                            await copy.write_row(row)
+
+                    await cur.execute(
+                        f"""
+                        WITH new_user AS (
+                            INSERT INTO {self.schema}.user (user_id, username)
+                            SELECT user_id, username FROM bulk_users
+                            ON CONFLICT (username) DO NOTHING
+                            RETURNING user_id
+                        ),
+                        new_auth AS (
+                            INSERT INTO {self.schema}.user_auth (user_id, api_key_hash)
+                            SELECT b.user_id, b.api_key_hash
+                            FROM bulk_users b
+                            JOIN new_user n ON n.user_id = b.user_id
+                        ),
+                        new_perm AS (
+                            INSERT INTO {self.schema}.user_perm (user_id, is_admin, activated)
+                            SELECT b.user_id, b.is_admin, b.activated
+                            FROM bulk_users b
+                            JOIN new_user n ON n.user_id = b.user_id
+                        )
+                        SELECT user_id FROM new_user;
+                        """
+                    )
+
+                    created = {str(row["user_id"]) for row in await cur.fetchall()}
+
+                await conn.commit()
+
+            except Exception as e:
+                logger.error(f"Error bulk creating accounts: {e}")
+                await conn.rollback()
+                raise UserRecordCreationError("Unexpected error while bulk creating user records")
+
+        for user_id, _, hashed_api_key, _, _ in staged:
+            if str(user_id) in created:
+                api_key_filter.add(hashed_api_key)
+
+        for result in results:
+            if result["status"] is None:
+                if result["user_id"] in created:
+                    result["status"] = "created"
+                else:
+                    # Username already taken, the generated key was never stored
+                    result["status"] = "exists"
+                    del result["user_id"], result["api_key"]
+
+        return results
+
+    async def update_user_perm(self, user_id: str, is_admin: bool = None, activated: bool = None) -> bool:
+        """
+        Update the permission flags for a user.
+
+        This function compares requested values to the current permission
+        record and issues an UPDATE only for fields that actually change.
+
+        Args:
+            user_id: The UUID (string) of the user to update.
+            is_admin: Optional boolean to set admin flag.
+            activated: Optional boolean to set activation flag.
+
+        Returns:
+            bool: True on successful update.
+
+        Raises:
+            NoChangesNeeded: If no values were provided or no changes are required.
+            UserPermReadError: If the user's permission record cannot be loaded.
+        """
+        user_perm = await self._get_user_perm_record(user_id=user_id)
+        if not user_perm:
+            raise UserPermReadError("User perm was not returned.")
+        
+        if is_admin is None and activated is None:
+                raise NoChangesNeeded("No values provided to update user_perm")
+
+        updates = []
+        values = []
+
+        if is_admin is not None:
+            if is_admin != user_perm["is_admin"]:
+                updates.append("is_admin = %s")
+                values.append(is_admin)
+
+        if activated is not None:
+            if activated != user_perm["activated"]:
+                updates.append("activated = %s")
+                values.append(activated)
+
+        if not updates:
+            raise NoChangesNeeded("No changes would be made in user_perm.")
+        
+        values.append(user_id)
+
+        query = f"""
+            UPDATE {self.schema}.user_perm
+            SET {", ".join(updates)}
+            WHERE user_id = %s AND deleted_at IS NULL
+        """
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, values)
+
+                    if cur.rowcount == 0:
+                        raise NoRowsAffected("No rows where affected while updating user_perm")
+
+                await conn.commit()
+                principal_cache.invalidate_owner(user_id)
+
+            except NoRowsAffected:
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                if self._is_immutable_error(e):
+                    raise ImmutableException("Could not update user_perm: user is immutable")
+
+                raise
+
+        return True
+
+    async def bulk_update_user_perm(self, user_ids: list, acting_user_id: str, is_admin: bool = None, activated: bool = None) -> list:
+        """
+        Update the permission flags of many users in one set-based statement.
+
+        Immutable users and the acting admin are skipped, rows that already
+        have the requested values are left untouched.
+
+        Args:
+            user_ids: UUIDs (strings) of the users to update.
+            acting_user_id: UUID of the admin performing the change (can not change itself).
+            is_admin: Optional boolean to set admin flag.
+            activated: Optional boolean to set activation flag.
+
+        Returns:
+            list[dict]: One {"user_id", "status"} per distinct requested id in
+            request order. Status is one of `updated`, `unchanged`,
+            `not_found`, `immutable` or `self`.
+
+        Raises:
+            NoChangesNeeded: If no values were provided.
+            ImmutableException: If the immutable user trigger rejected the update.
+        """
+        if is_admin is None and activated is None:
+            raise NoChangesNeeded("No values provided to update user_perm")
+
+        requested = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        WITH target AS (
+                            SELECT r.user_id, u.immutable, (p.user_id IS NULL OR p.deleted_at IS NOT NULL) AS missing
+                            FROM unnest(%(user_ids)s::uuid[]) AS r(user_id)
+                            LEFT JOIN {self.schema}.user u ON u.user_id = r.user_id
+                            LEFT JOIN {self.schema}.user_perm p ON p.user_id = r.user_id
+                        ),
+                        updated AS (
+                            UPDATE {self.schema}.user_perm p
+                            SET
+                                is_admin = COALESCE(%(is_admin)s::boolean, p.is_admin),
+                                activated = COALESCE(%(activated)s::boolean, p.activated)
+                            FROM target t
+                            WHERE p.user_id = t.user_id
+                                AND NOT t.missing
+                                AND NOT t.immutable
+                                AND t.user_id <> %(acting_user_id)s::uuid
+                                AND (
+                                    p.is_admin IS DISTINCT FROM COALESCE(%(is_admin)s::boolean, p.is_admin)
+                                    OR p.activated IS DISTINCT FROM COALESCE(%(activated)s::boolean, p.activated)
+                                )
+                            RETURNING p.user_id
+                        )
+                        SELECT
+                            t.user_id,
+                            CASE
+                                WHEN t.missing THEN 'not_found'
+                                WHEN t.user_id = %(acting_user_id)s::uuid THEN 'self'
+                                WHEN t.immutable THEN 'immutable'
+                                WHEN upd.user_id IS NOT NULL THEN 'updated'
+                                ELSE 'unchanged'
+                            END AS status
+                        FROM target t
+                        LEFT JOIN updated upd ON upd.user_id = t.user_id;
+                        """,
+                        {
+                            "user_ids": requested,
+                            "acting_user_id": str(acting_user_id),
+                            "is_admin": is_admin,
+                            "activated": activated
+                        }
+                    )
+
+                    statuses = {str(row["user_id"]): row["status"] for row in await cur.fetchall()}
+
+                await conn.commit()
+
+            except Exception as e:
+                await conn.rollback()
+                if self._is_immutable_error(e):
+                    raise ImmutableException("Could not update user_perm: user is immutable")
+
+                raise
+
+        for user_id, status in statuses.items():
+            if status == "updated":
+                principal_cache.invalidate_owner(user_id)
+
+        return [{"user_id": user_id, "status": statuses.get(user_id, "not_found")} for user_id in requested]
+
+    async def delete_user(self, user_id: str) -> bool:
+        """
+        Soft delete a user after validating existence and admin safety constraints.
+
+        The user is only marked as deleted (`user_perm.deleted_at`), which
+        removes it from authentication, listings and the counters right away.
+        The rows are purged later by the purge worker (see
+        `purge_deleted_users`) and can be restored until then.
+
+        Existence, immutability and the last-admin guard are checked by the
+        same statement that deletes the user. Deleting an active admin locks
+        the counter row (see migration 6f3d9a2b8e14), so concurrent deletions
+        of different admins are serialized and can never remove the last
+        active admin.
+
+        Args:
+            user_id: The unique identifier of the user to delete.
+
+        Returns:
+            True if the user was successfully deleted.
+
+        Raises:
+            UserNotFoundError:
+                If no user record exists for the given user_id
+            ImmutableException:
+                If the user is immutable.
+            LastAdminError:
+                If the user is the last active admin account.
+            UserDeletionError:
+                If an unexpected database error occurs during deletion.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        WITH target AS (
+                            SELECT
+                                u.user_id,
+                                u.immutable,
+                                COALESCE(p.is_admin AND p.activated, FALSE) AS active_admin
+                            FROM {self.schema}.user u
+                            JOIN {self.schema}.user_perm p ON p.user_id = u.user_id
+                            WHERE u.user_id = %s
+                                AND p.deleted_at IS NULL
+                            FOR UPDATE OF u, p
+                        ),
+                        counters AS (
+                            SELECT active_admins FROM {self.schema}.user_counters
+                            FOR UPDATE
+                        ),
+                        deleted AS (
+                            UPDATE {self.schema}.user_perm p
+                            SET deleted_at = now()
+                            FROM target t
+                            WHERE p.user_id = t.user_id
+                                AND NOT t.immutable
+                                AND (
+                                    NOT t.active_admin
+                                    OR (SELECT active_admins FROM counters) > 1
+                                )
+                            RETURNING p.user_id
+                        )
+                        SELECT
+                            t.immutable,
+                            EXISTS (SELECT 1 FROM deleted) AS deleted
+                        FROM target t;
+                        """,
+                        (user_id,)
+                    )
+
+                    result = (await cur.fetchone())
+
+                if result is None:
+                    raise UserNotFoundError("Requested user not found")
+
+                if result["immutable"]:
+                    raise ImmutableException("Could not delete user record: user is immutable")
+
+                if not result["deleted"]:
+                    raise LastAdminError("Last active admin can not be deleted.")
+
+                await conn.commit()
+                principal_cache.invalidate_owner(user_id)
+                return True
+
+            except (UserNotFoundError, ImmutableException, LastAdminError):
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                if self._is_immutable_error(e):
+                    raise ImmutableException("Could not delete user record: user is immutable")
+
+                logger.error(f"Error deleting account: {e}")
+                raise UserDeletionError("Unexpected error while deleting user.")
+
+    async def restore_user(self, user_id: str) -> bool:
+        """
+        Restore a soft deleted user that was not purged yet.
+
+        Args:
+            user_id: The unique identifier of the deleted user.
+
+        Returns:
+            True if the user was restored.
+
+        Raises:
+            UserNotFoundError:
+                If no soft deleted user exists for the given user_id.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        f"""
+                        UPDATE {self.schema}.user_perm
+                        SET deleted_at = NULL
+                        WHERE user_id = %s AND deleted_at IS NOT NULL
+                        """,
+                        (user_id,)
+                    )
+
+                    if cur.rowcount == 0:
+                        raise UserNotFoundError("No deleted user with this user_id found")
+
+                await conn.commit()
+                principal_cache.invalidate_owner(user_id)
+                return True
+
+            except UserNotFoundError:
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error restoring account: {e}")
+                raise
+
+    async def purge_deleted_users(self, retention: float, batch_size: int = 100) -> int:
+        """
+        Permanently delete one batch of users that were soft deleted before the retention window.
+
+        The oldest deletions are purged first. Rows locked by a concurrent
+        restore or purge are skipped, so several workers can purge at the
+        same time. Auth, perm and API key rows are removed by the cascade.
+
+        Args:
+            retention: Seconds a deleted user can still be restored.
+            batch_size: Maximum number of users purged by this call.
+
+        Returns:
+            int: Number of purged users.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        f"""
+                        WITH expired AS (
+                            SELECT user_id
+                            FROM {self.schema}.user_perm
+                            WHERE deleted_at < now() - make_interval(secs => %s::float8)
+                            ORDER BY deleted_at
+                            LIMIT %s
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        DELETE FROM {self.schema}.user u
+                        USING expired e
+                        WHERE u.user_id = e.user_id
+                            AND NOT u.immutable;
+                        """,
+                        (retention, batch_size)
+                    )
+
+                    purged = cur.rowcount
+
+                await conn.commit()
+                return purged
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error purging deleted accounts: {e}")
+                raise UserDeletionError("Unexpected error while purging deleted users.")
+
+    async def get_user_stats(self) -> dict:
+        """
+        Return the user totals from the trigger maintained counter row.
+
+        Returns:
+            dict: total_users, activated_users and active_admins.
+
+        Raises:
+            UserRecordReadError: If the counters could not be read.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        SELECT total_users, activated_users, active_admins
+                        FROM {self.schema}.user_counters
+                        """
+                    )
+
+                    counters = await cur.fetchone()
+
+            except Exception as e:
+                logger.error(f"Error reading user counters: {e}")
+                raise UserRecordReadError("User counters could not be read")
+
+        if counters is None:
+            raise UserRecordReadError("User counters are missing")
+
+        return counters
+
+    async def list_users(self, page: int, limit: int, cursor: str = None) -> tuple:
+        """
+        Return a paginated list of user records, newest first.
+
+        Pages are addressed either by `cursor` (keyset pagination on
+        `(created_at, user_id)`, constant cost for every page) or by the
+        legacy `page` number (OFFSET, kept for compatibility). If a cursor is
+        given `page` is ignored.
+
+        Args:
+            page: 1-based page number.
+            limit: Maximum number of records per page.
+            cursor: Opaque cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of user records, next cursor or None on the last page)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        if cursor:
+            created_at, user_id = self._decode_cursor(cursor, length=2)
+            try:
+                created_at = datetime.fromisoformat(created_at)
+                user_id = uuid.UUID(user_id)
+            except (TypeError, ValueError):
+                raise InvalidCursorError("Cursor contains invalid values")
+
+            query = f"""
+                SELECT * FROM {self.schema}.user u
+                WHERE (u.created_at, u.user_id) < (%s, %s)
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {self.schema}.user_perm p
+                        WHERE p.user_id = u.user_id AND p.deleted_at IS NOT NULL
+                    )
+                ORDER BY created_at DESC, user_id DESC
+                LIMIT %s
+            """
+            params = (created_at, user_id, limit + 1)
+
+        else:
+            query = f"""
+                SELECT * FROM {self.schema}.user u
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {self.schema}.user_perm p
+                    WHERE p.user_id = u.user_id AND p.deleted_at IS NOT NULL
+                )
+                ORDER BY created_at DESC, user_id DESC
+                LIMIT %s OFFSET %s
+            """
+            params = (limit + 1, (page - 1) * limit)
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(query, params)
+                    users = await cur.fetchall()
+
+            except Exception as e:
+                logger.error(f"Unexpected error while fetching users: {e}")
+                raise Exception("Unexpected error while fetching users")
+
+        # One extra row was fetched to know whether another page exists
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            last = users[-1]
+            next_cursor = self._encode_cursor(last["created_at"].isoformat(), str(last["user_id"]))
+
+        return users, next_cursor
+
+    async def search_users(self, query: str, mode: str = "prefix", limit: int = 50, cursor: str = None) -> tuple:
+        """
+        Search users by username, ordered by username.
+
+        Prefix searches use the `text_pattern_ops` index, substring searches
+        the trigram index (see migration 2e8b5f3a9c61). Results are keyset
+        paginated on the (unique) username.
+
+        Args:
+            query: Search term (sanitized like usernames).
+            mode: "prefix" or "substring".
+            limit: Maximum number of records per page.
+            cursor: Opaque cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of user records with perm flags, next cursor or None on the last page)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+            ValueError: If the mode is unknown.
+        """
+        if mode not in ("prefix", "substring"):
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        term = self._sanitize_username(username=query)
+        if not term:
+            return [], None
+
+        term = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") # Escape LIKE wildcards
+        pattern = f"{term}%" if mode == "prefix" else f"%{term}%"
+
+        conditions = ["u.username LIKE %s", "p.deleted_at IS NULL"]
+        params = [pattern]
+
+        if cursor:
+            (after,) = self._decode_cursor(cursor, length=1)
+            if not isinstance(after, str):
+                raise InvalidCursorError("Cursor contains invalid values")
+
+            conditions.append("u.username ~>~ %s")
+            params.append(after)
+
+        params.append(limit + 1)
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        SELECT
+                            u.user_id,
+                            u.username,
+                            u.created_at,
+                            u.last_login,
+                            u.immutable,
+                            p.is_admin,
+                            p.activated
+                        FROM {self.schema}.user u
+                        JOIN {self.schema}.user_perm p ON p.user_id = u.user_id
+                        WHERE {" AND ".join(conditions)}
+                        ORDER BY u.username USING ~<~
+                        LIMIT %s
+                        """,
+                        params
+                    )
+
+                    users = await cur.fetchall()
+
+            except Exception as e:
+                logger.error(f"Unexpected error while searching users: {e}")
+                raise Exception("Unexpected error while searching users")
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = self._encode_cursor(users[-1]["username"])
+
+        return users, next_cursor
+
+    async def iter_users_with_perm(self, batch_size: int = 1000):
+        """
+        Yield all users joined with their permission flags in fixed-size batches.
+
+        Uses a named server-side cursor, so only one batch is held in memory
+        and the first batch is available before the whole result is computed.
+        The connection stays checked out until the generator is exhausted or closed.
+
+        Args:
+            batch_size: Number of rows fetched per round trip.
+
+        Yields:
+            list[dict]: Up to `batch_size` user records.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            async with conn.cursor(name="user_export", row_factory=dict_row) as cur:
+                await cur.execute(
+                    f"""
+                    SELECT
+                        u.user_id,
+                        u.username,
+                        u.created_at,
+                        u.last_login,
+                        u.immutable,
+                        p.is_admin,
+                        p.activated
+                    FROM {self.schema}.user u
+                    JOIN {self.schema}.user_perm p ON p.user_id = u.user_id
+                    WHERE p.deleted_at IS NULL
+                    """
+                )
+
+                while True:
+                    rows = await cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    yield rows
+
+    async def update_last_logins(self, last_logins: list, batch_size: int = 1000) -> int:
+        """
+        Write coalesced last_login timestamps in set-based UPDATE statements.
+
+        Every batch is written as one `UPDATE ... FROM (VALUES ...)`
+        statement; all batches share one transaction. Timestamps never move
+        backwards.
+
+        Args:
+            last_logins: List of (user_id, datetime) tuples.
+            batch_size: Maximum number of rows per statement.
+
+        Returns:
+            int: Number of updated user records.
+        """
+        if not last_logins:
+            return 0
+
+        updated = 0
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    for start in range(0, len(last_logins), batch_size):
+                        batch = last_logins[start:start + batch_size]
+
+                        values_sql = ", ".join(["(%s::uuid, %s::timestamptz)"] * len(batch))
+                        params = [value for row in batch for value in row]
+
+                        await cur.execute(
+                            f"""
+                            UPDATE {self.schema}.user AS u
+                            SET last_login = v.last_login
+                            FROM (VALUES {values_sql}) AS v(user_id, last_login)
+                            WHERE u.user_id = v.user_id
+                                AND (u.last_login IS NULL OR u.last_login < v.last_login)
+                            """, params)
+
+                        updated += cur.rowcount
+
+                await conn.commit()
+                return updated
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error updating last logins: {e}")
+                raise
+
+    async def create_api_key(self, user_id: str, max_keys: int) -> dict:
+        """
+        Create an additional API key (`<key_prefix>.<secret>`) for a user.
+
+        Args:
+            user_id: The UUID (string) of the key owner.
+            max_keys: Maximum number of active (not revoked or expired) keys of the user.
+
+        Returns:
+            dict: {"key_id", "key_prefix", "created_at", "api_key"} (the plain
+            key is only returned here and never stored).
+
+        Raises:
+            APIKeyLimitError: If the user already has `max_keys` active keys.
+            KeyHashError: If the generated key could not be hashed.
+            UserAuthCreationError: On unexpected database errors.
+        """
+        key_prefix, api_key = self._generate_prefixed_api_key()
+        hashed_api_key = self._hash_api_key(api_key=api_key)
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    # Serialize key creation per user, otherwise concurrent requests all see count < max_keys.
+                    # Must be its own statement, the count below only sees rows committed before it starts.
+                    await cur.execute(
+                        f"SELECT 1 FROM {self.schema}.user WHERE user_id = %s FOR NO KEY UPDATE",
+                        (user_id,)
+                    )
+
+                    await cur.execute(
+                        f"""
+                        INSERT INTO {self.schema}.api_keys (user_id, key_prefix, key_hash)
+                        SELECT %(user_id)s, %(key_prefix)s, %(key_hash)s
+                        WHERE (
+                            SELECT COUNT(*) FROM {self.schema}.api_keys
+                            WHERE user_id = %(user_id)s
+                                AND NOT revoked
+                                AND (expires_at IS NULL OR expires_at > now())
+                        ) < %(max_keys)s
+                        RETURNING key_id, key_prefix, created_at
+                        """,
+                        {
+                            "user_id": user_id,
+                            "key_prefix": key_prefix,
+                            "key_hash": hashed_api_key,
+                            "max_keys": max_keys
+                        }
+                    )
+
+                    key = await cur.fetchone()
+
+                if key is None:
+                    raise APIKeyLimitError(f"User already has {max_keys} active API keys")
+
+                await conn.commit()
+
+            except APIKeyLimitError:
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error creating api key: {e}")
+                raise UserAuthCreationError("Unexpected error while creating api key")
+
+        api_key_filter.add(hashed_api_key)
+
+        key["api_key"] = api_key
+        return key
+
+    async def rotate_api_key(self, user_id: str, max_keys: int, key_id: str = None, grace_period: float = 86400.0) -> dict:
+        """
+        Issue a new API key and let an existing key expire after a grace window.
+
+        Both keys stay valid until the old key's `expires_at`, which is
+        enforced by the principal lookup query. Only keys without an expiry
+        can be rotated, so every key is replaced at most once.
+
+        Args:
+            user_id: The UUID (string) of the key owner.
+            max_keys: Maximum number of active additional keys of the user
+                (the rotated key itself is not counted).
+            key_id: Key to rotate, None rotates the user's initial (`user_auth`) key.
+            grace_period: Seconds the old key stays valid.
+
+        Returns:
+            dict: {"key_id", "key_prefix", "created_at", "api_key",
+            "rotated_key_id", "rotated_key_expires_at"}
+
+        Raises:
+            APIKeyNotFoundError: If there is no active key to rotate (unknown,
+                revoked or expired key, or the initial key of an immutable user).
+            APIKeyRotationInProgressError: If the key is already in a grace window.
+            APIKeyLimitError: If the user already has `max_keys` other active keys.
+            KeyHashError: If the generated key could not be hashed.
+            UserAuthCreationError: On unexpected database errors.
+        """
+        key_prefix, api_key = self._generate_prefixed_api_key()
+        hashed_api_key = self._hash_api_key(api_key=api_key)
+
+        if key_id is None:
+            # The initial key of immutable users (e.g. the init admin) is never rotated
+            target_key = f"""
+                SELECT NULL::uuid AS key_id, a.api_key_expires_at AS expires_at
+                FROM {self.schema}.user_auth AS a
+                JOIN {self.schema}.user AS u ON u.user_id = a.user_id
+                WHERE a.user_id = %(user_id)s
+                    AND NOT u.immutable
+                    AND a.api_key_hash IS NOT NULL
+                    AND (a.api_key_expires_at IS NULL OR a.api_key_expires_at > now())
+            """
+            expire_old_key = f"""
+                UPDATE {self.schema}.user_auth AS a
+                SET api_key_expires_at = now() + make_interval(secs => %(grace_period)s::float8)
+                FROM target AS t
+                WHERE a.user_id = %(user_id)s
+                    AND t.expires_at IS NULL
+                    AND (SELECT within_limit FROM key_limit)
+                RETURNING NULL::uuid AS key_id, a.api_key_expires_at AS expires_at
+            """
+        else:
+            target_key = f"""
+                SELECT k.key_id, k.expires_at
+                FROM {self.schema}.api_keys AS k
+                WHERE k.key_id = %(key_id)s
+                    AND k.user_id = %(user_id)s
+                    AND NOT k.revoked
+                    AND (k.expires_at IS NULL OR k.expires_at > now())
+            """
+            expire_old_key = f"""
+                UPDATE {self.schema}.api_keys AS k
+                SET expires_at = now() + make_interval(secs => %(grace_period)s::float8)
+                FROM target AS t
+                WHERE k.key_id = t.key_id
+                    AND t.expires_at IS NULL
+                    AND (SELECT within_limit FROM key_limit)
+                RETURNING k.key_id, k.expires_at
+            """
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    # Same per user lock as create_api_key, serializes rotations and key creations
+                    await cur.execute(
+                        f"SELECT 1 FROM {self.schema}.user WHERE user_id = %s FOR NO KEY UPDATE",
+                        (user_id,)
+                    )
+
+                    await cur.execute(
+                        f"""
+                        WITH target AS (
+                            {target_key}
+                        ),
+                        key_limit AS (
+                            SELECT (
+                                SELECT COUNT(*) FROM {self.schema}.api_keys
+                                WHERE user_id = %(user_id)s
+                                    AND NOT revoked
+                                    AND (expires_at IS NULL OR expires_at > now())
+                                    AND key_id IS DISTINCT FROM (SELECT key_id FROM target)
+                            ) < %(max_keys)s AS within_limit
+                        ),
+                        old_key AS (
+                            {expire_old_key}
+                        ),
+                        new_key AS (
+                            INSERT INTO {self.schema}.api_keys (user_id, key_prefix, key_hash)
+                            SELECT %(user_id)s, %(key_prefix)s, %(key_hash)s
+                            FROM old_key
+                            RETURNING key_id, key_prefix, created_at
+                        )
+                        SELECT
+                            t.expires_at IS NOT NULL AS rotating,
+                            l.within_limit,
+                            n.key_id,
+                            n.key_prefix,
+                            n.created_at,
+                            o.key_id AS rotated_key_id,
+                            o.expires_at AS rotated_key_expires_at
+                        FROM target t
+                        CROSS JOIN key_limit l
+                        LEFT JOIN new_key n ON TRUE
+                        LEFT JOIN old_key o ON TRUE;
+                        """,
+                        {
+                            "user_id": user_id,
+                            "key_id": key_id,
+                            "key_prefix": key_prefix,
+                            "key_hash": hashed_api_key,
+                            "grace_period": grace_period,
+                            "max_keys": max_keys
+                        }
+                    )
+
+                    key = await cur.fetchone()
+
+                if key is None:
+                    raise APIKeyNotFoundError("No active API key to rotate")
+
+                if key.pop("rotating"):
+                    raise APIKeyRotationInProgressError("API key is already being rotated")
+
+                if not key.pop("within_limit"):
+                    raise APIKeyLimitError(f"User already has {max_keys} active API keys")
+
+                await conn.commit()
+
+            except (APIKeyNotFoundError, APIKeyRotationInProgressError, APIKeyLimitError):
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error rotating api key: {e}")
+                raise UserAuthCreationError("Unexpected error while rotating api key")
+
+        # Cached entries of the old key have to pick up the new expiry
+        principal_cache.invalidate_owner(user_id)
+        api_key_filter.add(hashed_api_key)
+
+        key["api_key"] = api_key
+        return key
+
+    async def list_api_keys(self, user_id: str) -> list:
+        """
+        List the additional API keys of a user, newest first.
+
+        Args:
+            user_id: The UUID (string) of the key owner.
+
+        Returns:
+            list[dict]: key_id, key_prefix, created_at, last_used_at, expires_at and revoked of every key.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        SELECT key_id, key_prefix, created_at, last_used_at, expires_at, revoked
+                        FROM {self.schema}.api_keys
+                        WHERE user_id = %s
+                        ORDER BY created_at DESC
+                        """, (user_id,))
+
+                    return await cur.fetchall()
+
+            except Exception as e:
+                logger.error(f"Unexpected error while listing api keys: {e}")
+                raise APIKeyLookupError("Unexpected error while listing api keys")
+
+    async def revoke_api_key(self, user_id: str, key_id: str) -> bool:
+        """
+        Revoke an additional API key of a user.
+
+        Args:
+            user_id: The UUID (string) of the key owner.
+            key_id: The UUID (string) of the key.
+
+        Returns:
+            True if the key was revoked.
+
+        Raises:
+            APIKeyNotFoundError: If the user has no key with this key_id.
+            NoChangesNeeded: If the key is already revoked.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(
+                        f"""
+                        WITH target AS (
+                            SELECT key_id, revoked
+                            FROM {self.schema}.api_keys
+                            WHERE key_id = %s
+                                AND user_id = %s
+                            FOR UPDATE
+                        ),
+                        updated AS (
+                            UPDATE {self.schema}.api_keys k
+                            SET revoked = TRUE
+                            FROM target t
+                            WHERE k.key_id = t.key_id
+                                AND NOT t.revoked
+                            RETURNING k.key_id
+                        )
+                        SELECT EXISTS (SELECT 1 FROM updated) AS revoked
+                        FROM target;
+                        """, (key_id, user_id))
+
+                    result = await cur.fetchone()
+
+                if result is None:
+                    raise APIKeyNotFoundError("API key not found")
+
+                if not result["revoked"]:
+                    raise NoChangesNeeded("API key is already revoked")
+
+                await conn.commit()
+
+            except (APIKeyNotFoundError, NoChangesNeeded):
+                await conn.rollback()
+                raise
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error revoking api key: {e}")
+                raise
+
+        principal_cache.invalidate_owner(user_id)
+        api_key_filter.discard()
+        return True
+
+    async def update_api_key_last_used(self, last_used: list, batch_size: int = 1000) -> int:
+        """
+        Write coalesced last_used_at timestamps of additional API keys.
+
+        Works like `update_last_logins`, keyed by key_id.
+
+        Args:
+            last_used: List of (key_id, datetime) tuples.
+            batch_size: Maximum number of rows per statement.
+
+        Returns:
+            int: Number of updated key records.
+        """
+        if not last_used:
+            return 0
+
+        updated = 0
+
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    for start in range(0, len(last_used), batch_size):
+                        batch = last_used[start:start + batch_size]
+
+                        values_sql = ", ".join(["(%s::uuid, %s::timestamptz)"] * len(batch))
+                        params = [value for row in batch for value in row]
+
+                        await cur.execute(
+                            f"""
+                            UPDATE {self.schema}.api_keys AS k
+                            SET last_used_at = v.last_used_at
+                            FROM (VALUES {values_sql}) AS v(key_id, last_used_at)
+                            WHERE k.key_id = v.key_id
+                                AND (k.last_used_at IS NULL OR k.last_used_at < v.last_used_at)
+                            """, params)
+
+                        updated += cur.rowcount
+
+                await conn.commit()
+                return updated
+
+            except Exception as e:
+                await conn.rollback()
+                logger.error(f"Error updating api key last use: {e}")
+                raise
+
+    async def _get_principal_by_api_key(self, hashed_api_key: bytes, key_prefix: str = None) -> dict:
+        """
+        Resolve the principal for a hashed API key in a single query.
+
+        Keys with a prefix (`<key_prefix>.<secret>`) are looked up in
+        `api_keys` by their indexed prefix and the stored hash is compared in
+        constant time afterwards. All other keys are looked up in `user_auth`
+        by hash. Both statements join `user_perm` and `user` on one connection
+        checkout and are prepared server-side because they run on every
+        authenticated request. Expired keys (rotation grace window over) are
+        filtered by the query itself.
+
+        Args:
+            hashed_api_key: Raw HMAC digest of the API key.
+            key_prefix: Public prefix of the key, None for `user_auth` keys.
+
+        Returns:
+            dict: {"user_id", "is_admin", "activated", "immutable", "key_id", "expires_in"}
+            (`key_id` is None for `user_auth` keys, `expires_in` is the number
+            of seconds until the key expires or None)
+
+        Raises:
+            UserNotFoundError: If no user matches the key.
+            APIKeyLookupError: On unexpected errors during DB lookup.
+        """
+        async with async_postgres_pool.get_connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    if key_prefix is None:
+                        await cur.execute(
+                            f"""
+                            SELECT
+                                a.user_id,
+                                p.is_admin,
+                                p.activated,
+                                u.immutable,
+                                NULL::uuid AS key_id,
+                                EXTRACT(EPOCH FROM a.api_key_expires_at - now())::float8 AS expires_in
+                            FROM {self.schema}.user_auth AS a
+                            JOIN {self.schema}.user_perm AS p ON p.user_id = a.user_id
+                            JOIN {self.schema}.user AS u ON u.user_id = a.user_id
+                            WHERE a.api_key_hash = %s
+                                AND (a.api_key_expires_at IS NULL OR a.api_key_expires_at > now())
+                                AND p.deleted_at IS NULL
+                            LIMIT 1
+                            """, (hashed_api_key,), prepare=True)
+
+                        principal = (await cur.fetchone())
+
+                    else:
+                        await cur.execute(
+                            f"""
+                            SELECT
+                                k.user_id,
+                                p.is_admin,
+                                p.activated,
+                                u.immutable,
+                                k.key_id,
+                                k.key_hash,
+                                EXTRACT(EPOCH FROM k.expires_at - now())::float8 AS expires_in
+                            FROM {self.schema}.api_keys AS k
+                            JOIN {self.schema}.user_perm AS p ON p.user_id = k.user_id
+                            JOIN {self.schema}.user AS u ON u.user_id = k.user_id
+                            WHERE k.key_prefix = %s
+                                AND NOT k.revoked
+                                AND (k.expires_at IS NULL OR k.expires_at > now())
+                                AND p.deleted_at IS NULL
+                            """, (key_prefix,), prepare=True)
+
+                        principal = (await cur.fetchone())
+
+                        if principal and not hmac.compare_digest(bytes(principal.pop("key_hash")), hashed_api_key):
+                            principal = None
+
+            except Exception as e:
+                logger.error(f"Error resolving principal by api_key: {e}")
+                raise APIKeyLookupError("Unexpected error while performing api_key lookup")
+
+        if not principal:
+            raise UserNotFoundError("User by api key could not be loaded")
+
+        return principal
+
+    async def get_user_perm_by_api_key(self, api_key: str) -> dict:
+        """
+        Resolve a user's permission record by their plain API key.
+
+        The method hashes the provided API key using the configured
+        `API_KEY_SECRET` and looks up the associated user permission
+        record in the database. Resolved records are kept in the
+        `principal_cache` so repeated requests skip the database, and
+        keys rejected by the `api_key_filter` never reach it.
+
+        Args:
+            api_key: Plain API key string as provided by the client.
+
+        Returns:
+            dict: User permission record for the matched user
+            (`user_id`, `is_admin`, `activated`, `immutable`, `key_id`).
+
+        Raises:
+            APIKeyEmptyError: If `api_key` is empty or falsy.
+            KeyHashError: If hashing fails.
+            UserNotFoundError: If no user matches the provided API key.
+        """
+        if not api_key:
+            raise APIKeyEmptyError("API Key is empty")
+
+        hashed_api_key = self._hash_api_key(api_key=api_key)
+        if not hashed_api_key:
+            raise KeyHashError("No hashed API key was returned")
+
+        # Serve repeated lookups from the in-process cache
+        cached_user = principal_cache.get(hashed_api_key)
+        if cached_user is not None:
+            return cached_user
+
+        # Reject keys that are definitely not stored without touching the database
+        if not api_key_filter.might_contain(hashed_api_key):
+            raise UserNotFoundError("User by api key could not be loaded")
+
+        # Remember the cache epoch so an invalidation during the lookup is not overwritten
+        cache_epoch = principal_cache.epoch()
+
+        key_prefix = self._get_api_key_prefix(api_key=api_key)
+        user = await self._get_principal_by_api_key(hashed_api_key=hashed_api_key, key_prefix=key_prefix)
+
+        # Keys in a rotation grace window must not outlive their expiry in the cache
+        expires_in = user.pop("expires_in", None)
+
+        principal_cache.set(hashed_api_key, owner=user["user_id"], value=user, epoch=cache_epoch, ttl=expires_in)
+
+        return user
+
+    async def get_user_by_user_id(self, user_id: str) -> dict:
+        """
+        Load full user and permission records by `user_id`.
+
+        Returns a combined dictionary containing `user_id`, the user
+        record (without the duplicated `user_id` field) and the
+        associated `user_perm` record.
+
+        Args:
+            user_id: The UUID (string) of the user to load.
+
+        Returns:
+            dict: {"user_id": <id>, "user": <user_record>, "user_perm": <perm_record>}
+        """
+        user_record = await self._get_user_record(user_id=user_id)
+        user_perm_record = await self._get_user_perm_record(user_id=user_id)
+        
+        # Remove unnecessary user_id from user recods
+        user_record.pop("user_id", None)
+        user_perm_record.pop("user_id", None)
+        user_perm_record.pop("deleted_at", None)
+
+        return {"user_id": user_id, "user": user_record, "user_perm": user_perm_record}
+
+    def is_ready(self) -> bool:
+        """
+        Check if the user database is initialized and the async pool is open.
+        Returns:
+            True if the database is ready, False otherwise.
+        """
+        return self._ready and async_postgres_pool.is_ready()
+    
+# Global singleton instance
+async_user_database = AsyncUserDatabase()
@@ -0,0 +1,147 @@
+"""
+Shared helpers for the sync and async user database implementations.
+"""
+
+# Import regular expressions and other utilities
+import re
+import secrets
+import hashlib
+import hmac
+
+# Import cursor encoding utilities
+from api.utils.cursor import encode_cursor, decode_cursor
+
+# Import configuration constants
+from api.config.config import API_KEY_SECRET, API_KEY_PREFIX_LENGTH
+
+from api.database.migrate import migration_needed
+
+from api.exceptions.exceptions import *
+
+class BaseUserDatabase:
+    """Base class with database independent user helpers."""
+
+    def __init__(self):
+        """Initialize the user database connection."""
+        self._ready = False
+        self.schema = "users"
+
+        self.demo_api_key = None
+
+    def init_db(self) -> bool:
+        """
+        Initialize the readiness state for the user database.
+
+        This checks whether a migration is needed and sets the internal
+        `_ready` flag accordingly.
+
+        Returns:
+            bool: True if the database is up-to-date (no migration needed),
+            False otherwise.
+        """
+        self._ready = not migration_needed()
+        return self._ready
+
+    def _is_immutable_error(self, e) -> bool:
+        """
+        Detect whether a database exception represents an immutable-column error.
+
+        Checks the exception for a Postgres-specific SQLSTATE code used by
+        the application to signal attempts to modify immutable columns.
+
+        Args:
+            e: Exception instance returned by the DB driver.
+
+        Returns:
+            bool: True if the exception corresponds to the immutable error code.
+        """
+        return getattr(e, "sqlstate", None) == "P7501"
+
+    def _generate_api_key(self) -> str:
+        """
+        Generate a secure random API key.
+        Returns:
+            str: The generated API key.
+        """
+        return secrets.token_urlsafe(32)
+    
+    def _generate_prefixed_api_key(self) -> tuple:
+        """
+        Generate an additional API key of the form `<key_prefix>.<secret>`.
+
+        The prefix is public (shown in key listings) and used to look the
+        key up, the secret never leaves the response that created it.
+
+        Returns:
+            tuple: (key_prefix, api_key)
+        """
+        key_prefix = secrets.token_hex(API_KEY_PREFIX_LENGTH // 2 + 1)[:API_KEY_PREFIX_LENGTH]
+        return key_prefix, f"{key_prefix}.{self._generate_api_key()}"
+
+    def _get_api_key_prefix(self, api_key: str) -> str | None:
+        """
+        Return the key prefix of an additional API key.
+
+        Keys stored in `user_auth` are plain `token_urlsafe` strings, which
+        never contain a dot, so they return None.
+        """
+        key_prefix, separator, _ = api_key.partition(".")
+        return key_prefix if separator else None
+
+    def _hash_api_key(self, api_key: str) -> bytes:
+        """
+        Create a HMAC-SHA256 hash of an API key using configured secret.
+        
+        Args:
+            api_key: The plain API key string to hash
+        
+        Returns:
+            The raw 32 byte HMAC-SHA256 digest (stored as bytea).
+        """
+        try:
+            return hmac.new(
+                API_KEY_SECRET.encode(),
+                api_key.encode(),
+                hashlib.sha256
+            ).digest()
+        except:
+            raise KeyHashError("API key could not be hashed")
+    
+    def _verify_api_key(self, api_key: str, stored_hash: bytes) -> bool:
+        """
+        verify an API key against a previously stored HMAC-SHA256 hash.
+
+        Args:
+            api_key: The plain API key provided by the client
+            stored_hash: The stored raw HMAC digest to verify against.
+
+        Returns:
+            True if the API key matches the stored hash, otherwise False.
+        """
+        return hmac.compare_digest(
+            self._hash_api_key(api_key),
+            stored_hash
+        )
+
+    def _sanitize_username(self, username: str) -> str:
+            """Sanitize a username by removing invalid characters.
+
+            The function strips any characters that are not ASCII letters,
+            digits or underscore and converts the result to lowercase.
+
+            Args:
+                username: Raw username string provided by caller.
+
+            Returns:
+                str: Sanitized username safe for storage.
+            """
+            cleaned = re.sub(r"[^A-Za-z0-9_]", "", username) # Only allow alphanumeric characters and underscores
+            return cleaned.lower() # Convert to lowercase for consistency
+
+    def _encode_cursor(self, *values) -> str:
+        """Encode the sort key of the last returned row (see `api.utils.cursor.encode_cursor`)."""
+        return encode_cursor(*values)
+
+    def _decode_cursor(self, cursor: str, length: int) -> list:
+        """Decode a cursor created by `_encode_cursor` (see `api.utils.cursor.decode_cursor`)."""
+        return decode_cursor(cursor, length)
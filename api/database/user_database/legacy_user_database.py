@@ -3,12 +3,16 @@ import hmac
 import hashlib
 import secrets
 import sqlite3
+import threading
 from enum import Enum
 from datetime import datetime
 from dotenv import load_dotenv
 from dataclasses import dataclass
 from typing import Optional, Dict, List
 
+from api.cache.principal_cache import PrincipalCache
+from api.config.config import LEGACY_KEY_CACHE_ENABLED, LEGACY_KEY_CACHE_MAX_SIZE, LEGACY_KEY_CACHE_TTL, LEGACY_SQLITE_BUSY_TIMEOUT, LEGACY_SQLITE_CACHED_STATEMENTS, LEGACY_KEY_SCAN_ENABLED, LEGACY_KEY_SCAN_CONCURRENCY, LEGACY_KEY_SCAN_TIMEOUT
+
 load_dotenv(dotenv_path="config.env")
 
 DEMO_MODE = os.getenv("DEMO_MODE", "false").lower() == "true"
@@ -31,6 +35,65 @@ class User:
     last_login: Optional[datetime] = None
     is_active: bool = True
 
+class SQLiteConnectionManager:
+    """
+    One persistent connection per thread for a SQLite database.
+
+    Connections are opened lazily, configured once (pragmas, statement cache)
+    and reused for every later call on the same thread.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = 5.0, cached_statements: int = 128):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return the connection of the calling thread.
+
+        Use it as `with manager.connection() as conn:`, which commits on
+        success and rolls back on errors without closing the connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        # Only used by the owning thread, check_same_thread=False just allows close() on shutdown
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+
+        with self._lock:
+            self._connections.append(conn)
+
+        return conn
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
 class SecureUserDatabase:
     def __init__(self, db_path: str = "users.db", pepper: Optional[str] = None):
 
@@ -40,16 +103,31 @@ class SecureUserDatabase:
         self.iterations = 600000
         self.salt_length = 32
         self.hash_length = 64
+
+        self._connections = SQLiteConnectionManager(
+            db_path=db_path,
+            busy_timeout=LEGACY_SQLITE_BUSY_TIMEOUT,
+            cached_statements=LEGACY_SQLITE_CACHED_STATEMENTS
+        )
+
+        # fingerprint -> username/role of verified keys, owned by the username
+        self.key_cache = PrincipalCache(
+            max_size=LEGACY_KEY_CACHE_MAX_SIZE,
+            ttl=LEGACY_KEY_CACHE_TTL,
+            enabled=LEGACY_KEY_CACHE_ENABLED
+        )
+
+        # Bounds the PBKDF2 scan over rows without a fingerprint, lookups wait up to the timeout for a slot
+        self.key_scan_enabled = LEGACY_KEY_SCAN_ENABLED
+        self.key_scan_timeout = max(0.0, LEGACY_KEY_SCAN_TIMEOUT)
+        self._key_scan_slots = threading.BoundedSemaphore(max(1, LEGACY_KEY_SCAN_CONCURRENCY))
         
         self._init_database()
     
     def _init_database(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
 
-            conn.execute("PRAGMA journal_mode=WAL;")
-            conn.execute("PRAGMA synchronous=NORMAL;")
-
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
                     username TEXT PRIMARY KEY,
@@ -58,9 +136,30 @@ class SecureUserDatabase:
                     salt TEXT NOT NULL,
                     created_at TEXT NOT NULL,
                     last_login TEXT,
-                    is_active INTEGER NOT NULL DEFAULT 1
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    key_fingerprint TEXT
                 )
             ''')
+
+            # Databases created before the fingerprint column existed
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(users)')]
+            if 'key_fingerprint' not in columns:
+                cursor.execute('ALTER TABLE users ADD COLUMN key_fingerprint TEXT')
+
+            # Replace the plain lookup index with a unique one. Duplicates can not
+            # exist, they are cleared anyway so the index creation can never fail.
+            cursor.execute('DROP INDEX IF EXISTS idx_users_key_fingerprint')
+            cursor.execute('''
+                UPDATE users
+                SET key_fingerprint = NULL
+                WHERE key_fingerprint IS NOT NULL
+                    AND rowid NOT IN (
+                        SELECT MIN(rowid) FROM users
+                        WHERE key_fingerprint IS NOT NULL
+                        GROUP BY key_fingerprint
+                    )
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_users_key_fingerprint_unique ON users (key_fingerprint)')
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS settings (
@@ -100,6 +199,10 @@ class SecureUserDatabase:
         
         return hash_bytes.hex()
     
+    def _fingerprint_api_key(self, api_key: str) -> str:
+        # Fast keyed lookup identifier, the PBKDF2 hash stays the actual proof
+        return hmac.new(self.pepper.encode('utf-8'), api_key.encode('utf-8'), hashlib.sha256).hexdigest()
+
     def _secure_compare(self, a: str, b: str) -> bool:
         return hmac.compare_digest(a.encode('utf-8'), b.encode('utf-8'))
     
@@ -110,7 +213,7 @@ class SecureUserDatabase:
         if username == "admin" and role == UserRole.ADMIN and first_run:
             print(f"Init admin key (only legacy routes): {api_key}")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT username FROM users WHERE username = ?', (username,))
@@ -125,9 +228,9 @@ class SecureUserDatabase:
             
             try:
                 cursor.execute('''
-                    INSERT INTO users (username, role, api_key_hash, salt, created_at, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (username, role.value, api_key_hash, salt, datetime.now().isoformat(), 1))
+                    INSERT INTO users (username, role, api_key_hash, salt, created_at, is_active, key_fingerprint)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (username, role.value, api_key_hash, salt, datetime.now().isoformat(), 1, self._fingerprint_api_key(api_key)))
                 
                 conn.commit()
                 return api_key
@@ -135,43 +238,88 @@ class SecureUserDatabase:
                 return False
     
     def _api_key_exists(self, api_key: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        # Generated keys have 512 bits of entropy, a collision with a row without fingerprint is not
+        # worth a PBKDF2 per row. The unique index rejects duplicate fingerprints on insert anyway.
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT api_key_hash, salt FROM users')
-            
-            for api_key_hash, salt in cursor.fetchall():
-                candidate_hash = self._hash_api_key(api_key, salt)
-                if self._secure_compare(candidate_hash, api_key_hash):
-                    return True
-            
-            return False
+            cursor.execute('SELECT 1 FROM users WHERE key_fingerprint = ?', (self._fingerprint_api_key(api_key),))
+            return cursor.fetchone() is not None
     
     def verify_api_key(self, api_key: str) -> Optional[tuple[str, UserRole]]:
-        with sqlite3.connect(self.db_path) as conn:
+        fingerprint = self._fingerprint_api_key(api_key)
+
+        cached = self.key_cache.get(fingerprint)
+        if cached is not None:
+            return (cached["username"], UserRole(cached["role"]))
+
+        epoch = self.key_cache.epoch()
+
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
+
+            # Indexed lookup, normally exactly one PBKDF2 verification
             cursor.execute('''
-                SELECT username, role, api_key_hash, salt 
-                FROM users 
-                WHERE is_active = 1
-            ''')
+                SELECT username, role, api_key_hash, salt
+                FROM users
+                WHERE key_fingerprint = ? AND is_active = 1
+            ''', (fingerprint,))
+            candidates = cursor.fetchall()
+
+            if candidates:
+                return self._verify_candidates(conn, api_key, fingerprint, candidates, epoch)
+
+        # Rows stored before fingerprints existed only get one on their first successful login
+        return self._scan_unfingerprinted(api_key, fingerprint, epoch)
+
+    def _scan_unfingerprinted(self, api_key: str, fingerprint: str, epoch: int) -> Optional[tuple[str, UserRole]]:
+        # Costs one PBKDF2 per row, so unknown keys must not be able to run it in parallel
+        if not self.key_scan_enabled or not self._key_scan_slots.acquire(timeout=self.key_scan_timeout):
+            return None
+
+        try:
+            with self._connections.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT username, role, api_key_hash, salt
+                    FROM users
+                    WHERE key_fingerprint IS NULL AND is_active = 1
+                ''')
+                candidates = cursor.fetchall()
+
+                return self._verify_candidates(conn, api_key, fingerprint, candidates, epoch)
+
+        finally:
+            self._key_scan_slots.release()
+
+    def _verify_candidates(self, conn: sqlite3.Connection, api_key: str, fingerprint: str, candidates: list, epoch: int) -> Optional[tuple[str, UserRole]]:
+        cursor = conn.cursor()
+
+        for username, role, api_key_hash, salt in candidates:
+            candidate_hash = self._hash_api_key(api_key, salt)
             
-            for username, role, api_key_hash, salt in cursor.fetchall():
-                candidate_hash = self._hash_api_key(api_key, salt)
+            if self._secure_compare(candidate_hash, api_key_hash):
+                cursor.execute('''
+                    UPDATE users 
+                    SET last_login = ?, key_fingerprint = ?
+                    WHERE username = ?
+                ''', (datetime.now().isoformat(), fingerprint, username))
+                conn.commit()
+
+                self.key_cache.set(fingerprint, owner=username, value={"username": username, "role": role}, epoch=epoch)
                 
-                if self._secure_compare(candidate_hash, api_key_hash):
-                    cursor.execute('''
-                        UPDATE users 
-                        SET last_login = ? 
-                        WHERE username = ?
-                    ''', (datetime.now().isoformat(), username))
-                    conn.commit()
-                    
-                    return (username, UserRole(role))
-            
-            return None
+                return (username, UserRole(role))
+        
+        return None
+
+    def list_unfingerprinted_users(self) -> List[str]:
+        # Once this is empty (e.g. after reissue_api_key for each of them), LEGACY_KEY_SCAN_ENABLED can be turned off
+        with self._connections.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT username FROM users WHERE key_fingerprint IS NULL AND is_active = 1 ORDER BY username')
+            return [username for (username,) in cursor.fetchall()]
     
     def get_user(self, username: str) -> Optional[User]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT username, role, api_key_hash, salt, created_at, last_login, is_active
@@ -196,7 +344,7 @@ class SecureUserDatabase:
             )
     
     def deactivate_user(self, username: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE users 
@@ -206,20 +354,22 @@ class SecureUserDatabase:
             
             if cursor.rowcount > 0:
                 conn.commit()
+                self.key_cache.invalidate_owner(username)
                 return True
             return False
     
     def delete_user(self, username: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM users WHERE username = ?', (username,))
             if cursor.rowcount > 0:
                 conn.commit()
+                self.key_cache.invalidate_owner(username)
                 return True
             return False
 
     def change_api_key(self, username: str, new_api_key: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT username FROM users WHERE username = ?', (username,))
@@ -235,17 +385,28 @@ class SecureUserDatabase:
             try:
                 cursor.execute('''
                     UPDATE users 
-                    SET salt = ?, api_key_hash = ? 
+                    SET salt = ?, api_key_hash = ?, key_fingerprint = ?
                     WHERE username = ?
-                ''', (new_salt, new_hash, username))
+                ''', (new_salt, new_hash, self._fingerprint_api_key(new_api_key), username))
                 
                 conn.commit()
+                self.key_cache.invalidate_owner(username)
                 return True
             except sqlite3.Error:
                 return False
     
+    def reissue_api_key(self, username: str) -> str | bool:
+        # Gives users without a fingerprint a key that no longer needs the PBKDF2 scan
+        api_key = self._generate_api_key()
+        if not self.change_api_key(username, api_key):
+            return False
+        return api_key
+
+    def close(self) -> None:
+        self._connections.close()
+
     def list_users(self) -> List[Dict[str, any]]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connections.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT username, role, created_at, last_login, is_active
@@ -265,6 +426,10 @@ class SecureUserDatabase:
             
             return users
 
+def close_user_database() -> None:
+    if _user_db_instance is not None:
+        _user_db_instance.close()
+
 def reset_database(db_path: str = "users.db") -> bool:
     global reset_database_done
 
@@ -2,6 +2,13 @@
 The main module for managing user database operations.
 """
 
+# Import constant time comparison
+import hmac
+
+# UUID generation and typing
+import uuid
+from typing import Callable
+
 # Import psycopg errors
 import psycopg.errors
 from psycopg.errors import UniqueViolation
@@ -9,15 +16,8 @@ from psycopg.errors import UniqueViolation
 # Import psycopg DictCursor
 from psycopg.rows import dict_row
 
-# Import regular expressions and other utilities
-import os
-import re
-import secrets
-import hashlib
-import hmac
-
 # Import configuration constants
-from api.config.config import API_KEY_SECRET, DEMO_MODE, RESET_DATABASE_WHEN_DEMO
+from api.config.config import DEMO_MODE, RESET_DATABASE_WHEN_DEMO
 
 # Import logger
 from api.logger.logger import logger
@@ -25,635 +25,401 @@ from api.logger.logger import logger
 # Import PostgreSQL connection pool
 from api.database.postgres_pool import postgres_pool
 
-from api.database.migrate import migration_needed
-
-from api.exceptions.exceptions import *
-
-class UserDatabase:
-    """Class to handle user database operations."""
-
-    def __init__(self):
-        """Initialize the user database connection."""
-        self._ready = False
-        self.schema = "users"
-
-        self.demo_api_key = None
-
-    def init_db(self) -> bool:
-        """
-        Initialize the readiness state for the user database.
-
-        This checks whether a migration is needed and sets the internal
-        `_ready` flag accordingly.
-
-        Returns:
-            bool: True if the database is up-to-date (no migration needed),
-            False otherwise.
-        """
-        self._ready = not migration_needed()
-        return self._ready
-
-    def _is_immutable_error(self, e) -> bool:
-        """
-        Detect whether a database exception represents an immutable-column error.
-
-        Checks the exception for a Postgres-specific SQLSTATE code used by
-        the application to signal attempts to modify immutable columns.
+# Import shared user database helpers
+from api.database.user_database.base_user_database import BaseUserDatabase
 
-        Args:
-            e: Exception instance returned by the DB driver.
+# Import principal cache and API key filter
+from api.cache.principal_cache import principal_cache
+from api.cache.api_key_filter import api_key_filter
 
-        Returns:
-            bool: True if the exception corresponds to the immutable error code.
-        """
-        return getattr(e, "sqlstate", None) == "P7501"
+from api.exceptions.exceptions import *
 
-    def _generate_api_key(self) -> str:
-        """
-        Generate a secure random API key.
-        Returns:
-            str: The generated API key.
-        """
-        return secrets.token_urlsafe(32)
-    
-    def _hash_api_key(self, api_key: str) -> str:
-        """
-        Create a HMAC-SHA256 hash of an API key using configured secret.
-        
-        Args:
-            api_key: The plain API key string to hash
-        
-        Returns:
-            A hexadecimal string representation of the HMAC-SHA256 digest.
-        """
-        try:
-            return hmac.new(
-                API_KEY_SECRET.encode(),
-                api_key.encode(),
-                hashlib.sha256
-            ).hexdigest()
-        except:
-            raise KeyHashError("API key could not be hashed")
-    
-    def _verify_api_key(self, api_key: str, stored_hash: str) -> bool:
-        """
-        verify an API key against a previously stored HMAC-SHA256 hash.
+class UserDatabase(BaseUserDatabase):
+    """
+    Class to handle synchronous user database operations.
 
-        Args:
-            api_key: The plain API key provided by the client
-            stored_hash: The stored hexadecimal HMAC hash to verify against.
+    Only used outside the request path (startup, init user, legacy migration,
+    API key filter refresh and benchmarks), routes use `AsyncUserDatabase`.
+    """
 
-        Returns:
-            True if the API key matches the stored hash, otherwise False.
+    def _create_user_records(self, username: str, hashed_api_key: bytes, is_admin: bool, activate: bool, immutable: bool = False) -> str:
         """
-        return hmac.compare_digest(
-            self._hash_api_key(api_key),
-            stored_hash
-        )
-
-    def _sanitize_username(self, username: str) -> str:
-            """Sanitize a username by removing invalid characters.
+        Create the user, auth and perm records of a new user in a single statement.
 
-            The function strips any characters that are not ASCII letters,
-            digits or underscore and converts the result to lowercase.
-
-            Args:
-                username: Raw username string provided by caller.
-
-            Returns:
-                str: Sanitized username safe for storage.
-            """
-            cleaned = re.sub(r"[^A-Za-z0-9_]", "", username) # Only allow alphanumeric characters and underscores
-            return cleaned.lower() # Convert to lowercase for consistency
-
-    def _delete_user_record(self, user_id: str) -> bool:
-        """
-        Delete a user record from the users table by user_id
+        The records are inserted by one CTE in one transaction, so a failure
+        never leaves a half-created user behind. The child rows normally
+        created by `users.create_user_children()` already exist at that point
+        and are skipped by the trigger (see migration 5d2a8f6c1e07).
 
         Args:
-            user_id: The unique identifier of the user to delete
-        
-        Returns:
-            True if the user record was successfully deleted
-        
-
-        Raises:
-            NoUserDeleted:
-                If no database row was affected (user_id not found).
-
-            UserDeletionError:
-                If an unexpected database error occurs during deletion.
-        """
-        with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        f"""
-                        DELETE FROM {self.schema}.user WHERE user_id = %s
-                        """,
-                        (user_id,)
-                    )
-
-                    if cur.rowcount == 0:
-                        raise NoUserDeleted("Requested user not found: No rows affected")
-                    
-                    else:
-                        return True
-
-            except NoUserDeleted:
-                raise
-
-            except Exception as e:
-                conn.rollback()
-                if self._is_immutable_error(e):
-                    raise ImmutableException("Could not delete user record: user is immutable")
-
-                logger.error(f"Error deleting account: {e}")
-                raise UserDeletionError("Unexpected error while deleting user.")
-
-    def _create_user_record(self, username: str, _immutable: bool = False) -> str:
-        """
-        Create a new user record in the database and return its generated user_id
+            username: The (sanitized) username to store.
+            hashed_api_key: The hash of the new API key.
+            is_admin: Whether the new user should have admin privileges.
+            activate: Whether the new user should be marked as activated.
+            immutable: Whether the new user should be immutable.
 
-        Args:
-            username: The username to store for the new user record.
-        
         Returns:
             The generated user_id of the newly created user.
 
         Raises:
-            NoDatabaseReturnError:
-                If no user_id is returned after the insert operation.
-            UserRecordCreationError:     
-                If an unexpected database error occurs.
             UniqueViolation:
-                If a unique key is not unique
+                If the username already exists.
+            UserRecordCreationError:
+                If no user_id is returned or an unexpected database error occurs.
         """
         with postgres_pool.get_connection() as conn:
             try:
                 with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(
                         f"""
-                        INSERT INTO {self.schema}.user (username)
-                        VALUES (%s)
-                        RETURNING user_id;
+                        WITH new_user AS (
+                            INSERT INTO {self.schema}.user (username, immutable)
+                            VALUES (%s, %s)
+                            RETURNING user_id
+                        ),
+                        new_auth AS (
+                            INSERT INTO {self.schema}.user_auth (user_id, api_key_hash)
+                            SELECT user_id, %s FROM new_user
+                        ),
+                        new_perm AS (
+                            INSERT INTO {self.schema}.user_perm (user_id, is_admin, activated)
+                            SELECT user_id, %s, %s FROM new_user
+                        )
+                        SELECT user_id FROM new_user;
                         """,
-                        (username,)
+                        (username, immutable, hashed_api_key, is_admin, activate)
                     )
 
-                    user_id = cur.fetchone()["user_id"]
-                    conn.commit()
-            
-                if user_id:
-                    return user_id
-                else:
-                    raise
+                    row = cur.fetchone()
 
-            except UniqueViolation:
+                if not row or not row["user_id"]:
+                    raise UserRecordCreationError("No user_id returned while creating user records")
+
+                conn.commit()
+                api_key_filter.add(hashed_api_key)
+                return row["user_id"]
+
+            except (UniqueViolation, UserRecordCreationError):
+                conn.rollback()
                 raise
 
             except Exception as e:
                 logger.error(f"Error creating account: {e}")
                 conn.rollback()
-                raise UserRecordCreationError("Unexpected error while creating user record")
-            
-    def _get_user_record(self, user_id: str) -> dict:
+                raise UserRecordCreationError("Unexpected error while creating user records")
+
+    def create_user(self, username: str, is_admin: bool, activate: bool, _immutable: bool = False) -> tuple:
         """
-        Load a single user record from the database by user_id.
+        Create a complete user including base record, auth data and permissions.
 
         Args:
-            user_id: The unique identifier of the user to load
+            username: The requested username (will be sanitized before storage).
+            is_admin: Whether the new user should have admin privileges.
+            activate: Whether the new user should be marked as activated.
 
         Returns:
-            A dictionary containing the full user record columns and values.
+            A tuple of (sanitized_username, user_id, api_key)
 
         Raises:
-            UserNotFoundError:
-                If no user record exists for the given user_id.
-            UserrecordReadError:
-                If a database or query error occurs while reading the record.
+            UniqueViolation:
+                If the username is already taken.
+            KeyHashError:
+                If the generated API key could not be hashed.
+            UserRecordCreationError:
+                If the user records could not be created.
         """
+        sanitized_username = self._sanitize_username(username=username)
 
-        with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        f"""
-                        SELECT * FROM {self.schema}.user WHERE user_id = %s
-                        """,
-                        (user_id,)
-                    )
-                    
-                    user = cur.fetchone()
-                    if user:
-                        return user
-                    else:
-                        raise UserNotFoundError(f"User record for user_id {user_id} could not be loaded")
+        api_key = self._generate_api_key()
+        hashed_api_key = self._hash_api_key(api_key=api_key)
 
-            except UserNotFoundError:
-                raise
+        user_id = self._create_user_records(
+            username=sanitized_username,
+            hashed_api_key=hashed_api_key,
+            is_admin=is_admin,
+            activate=activate,
+            immutable=_immutable
+        )
 
-            except Exception as e:
-                logger.error(f"Error getting user record: {e}")
-                raise UserRecordReadError(f"User record for user_id {user_id} could not be read")
+        return sanitized_username, user_id, api_key
 
-    def _get_user_perm_record(self, user_id: str) -> dict:
+    def import_legacy_users(self, users: list, on_created: Callable[[list], None] = None) -> list:
         """
-        Load the perm record for a user from the database.
+        Import users from the legacy SQLite store in one transaction.
+
+        Works like `AsyncUserDatabase.bulk_create_users` (COPY into a staging
+        table, one CTE, existing usernames are skipped) but keeps the legacy
+        `created_at` and `last_login` values. Legacy keys are PBKDF2 hashes
+        that can not be converted, so every imported user gets a new key.
+
+        The legacy username is stored in `user.legacy_username`, so a user
+        imported by an earlier run (`exists`) can be told apart from a
+        legacy user whose sanitized name is taken by another account
+        (`conflict`, the result contains the owner in `conflict_with`).
 
         Args:
-            user_id: The unique identifier of the user whose perm record shuld be loaded.
+            users: List of dicts with `username`, `is_admin`, `activated`,
+                `created_at` and `last_login`.
+            on_created: Called with the results of the created users before
+                the transaction is committed (e.g. to persist the new keys).
+                If it raises, nothing is imported.
 
         Returns:
-            A dictionary containing the user permission fields and values.
+            A list with one result dict per user (same order). Each result
+            has a `status` of `created`, `exists`, `conflict`, `duplicate`
+            (sanitized name already used in this batch) or `invalid`.
+            Created users also contain `user_id` and `api_key`.
 
         Raises:
-            UserNotFoundError:
-                If no perm record exists for the given user_id.
-            UserPermReadError:
-                If an unexpected database error occurs while reading user perm.
+            KeyHashError:
+                If an API key could not be hashed.
+            UserRecordCreationError:
+                If an unexpected database error occurs (nothing is imported).
         """
-        with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        f"""
-                        SELECT * FROM {self.schema}.user_perm WHERE user_id = %s
-                        """,
-                        (user_id,)
-                    )
+        results = []
+        staged = [] # (user_id, username, legacy_username, api_key_hash, is_admin, activated, created_at, last_login)
+        seen = {}
 
-                    user_perm = cur.fetchone()
-                if user_perm:
-                    return user_perm
-                else:
-                    raise UserNotFoundError(f"User perm record for {('user_id ' + str(user_id)) if user_id else 'api_key_hash'} could not be loaded")
+        for user in users:
+            username = self._sanitize_username(username=user["username"])
 
-            except UserNotFoundError:
-                raise
+            if not username:
+                results.append({"legacy_username": user["username"], "username": None, "status": "invalid"})
+                continue
 
-            except Exception as e:
-                logger.error(f"Error getting user perm record: {e}")
-                raise UserPermReadError(f"User perm for user_id {user_id} could not be read")
+            if username in seen:
+                results.append({"legacy_username": user["username"], "username": username, "conflict_with": seen[username], "status": "duplicate"})
+                continue
 
-    def _get_admin_count(self) -> int:
-        """
-        Count the number of active admin users in the database.
+            seen[username] = user["username"]
 
-        Returns:
-            The number of users who are both marked as admin and activated.
-            Returns 0 if the query fails due to an unexpected error.
+            user_id = uuid.uuid4()
+            api_key = self._generate_api_key()
+            hashed_api_key = self._hash_api_key(api_key=api_key)
+
+            staged.append((user_id, username, user["username"], hashed_api_key, user["is_admin"], user["activated"], user["created_at"], user["last_login"]))
+            results.append({"legacy_username": user["username"], "username": username, "user_id": str(user_id), "api_key": api_key, "status": None})
+
+        if not staged:
+            return results
 
-        """
         with postgres_pool.get_connection() as conn:
             try:
                 with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(
-                        f"""
-                        SELECT COUNT(*) AS admin_count
-                        FROM {self.schema}.user_perm
-                        WHERE is_admin = TRUE
-                            AND activated = TRUE 
+                        """
+                        CREATE TEMP TABLE legacy_users (
+                            user_id UUID,
+                            username TEXT,
+                            legacy_username TEXT,
+                            api_key_hash BYTEA,
+                            is_admin BOOLEAN,
+                            activated BOOLEAN,
+                            created_at TIMESTAMP,
+                            last_login TIMESTAMP
+                        ) ON COMMIT DROP;
                         """
                     )
 
-                    return cur.fetchone()["admin_count"]
-            
-            except Exception as e:
-                logger.error(f"Error counting active admins: {e}")
-                return 0
+                    with cur.copy(
+                        "COPY legacy_users (user_id, username, legacy_username, api_key_hash, is_admin, activated, created_at, last_login) FROM STDIN"
+                    ) as copy:
+                        copy.set_types(["uuid", "text", "text", "bytea", "bool", "bool", "timestamp", "timestamp"])
+                        for row in staged:
+                            copy.write_row(row)
 
-    def _create_user_auth_record(self, user_id: str) -> str:
-        """
-        Create the authentication record for a user and return a new API key.
-
-        Args:
-            user_id: The unique identifier of the user whose auth record shuld be created.
-
-        Returns:
-            The newly generated plain API key.
-
-        Raises:
-            NoUserAuthCreatedError:
-                If the update affects zero rows (no auth record found for user_id)
-            UserAuthCreationError:
-                If an unexpected database error occurs during the operation.
-        """
-        api_key = self._generate_api_key()
-
-        try:
-            hashed_api_key = self._hash_api_key(api_key=api_key)
-        except KeyHashError:
-            raise
-
-        with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor() as cur:
                     cur.execute(
                         f"""
-                        UPDATE {self.schema}.user_auth
-                        SET api_key_hash = %s
-                        WHERE user_id = %s;
-                        """,
-                        (hashed_api_key, user_id)
-                    )
-
-                    if cur.rowcount == 0:
-                        raise NoUserAuthCreatedError("Error creating user auth record: No rows affected")
-                    
-                    conn.commit()
-                    return api_key
-            
-            except NoUserAuthCreatedError:
-                raise
-
-            except Exception as e:
-                logger.error(f"Error creating creating auth record: {e}")
-                conn.rollback()
-                raise UserAuthCreationError("Error while creating user auth table.")
-
-    def _set_user_perm_record(self, user_id: str, is_admin: bool, activate: bool) -> bool:
-        """
-        Update the permission flags for a user in the user_perm table.
-        Note: Can currently only be used for account creation as updating is based on default values.
-
-        Args:
-            user_id: The unique identifier of the user whose permissions should be updated.
-            is_admin: Whether the user should have admin privileges.
-            activate: Whether the user account shouldbe marked as activated.
-
-        Returns:
-            True if the permissions are already at default values or were updated successfully in the database.
-
-        Raises:
-            NoRowsAffected:
-                If the update query did not modify any row (user_id not found)
-            UserPermEditError:
-                If an unexpected database error occurs during the update.
-        """
-        if activate == False and is_admin == False:
-            # Since activate is set to false and user is no admin, which are default values there is nothing to do here
-            # // TODO: Update to support changes back to default values -> Only if needed in future features
-            return True
-        
-        else:
-            with postgres_pool.get_connection() as conn:
-                try:
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            f"""
-                            UPDATE {self.schema}.user_perm
-                            SET 
-                                activated = %s, 
-                                is_admin = %s
-                            WHERE user_id = %s;
-                            """,
-                            (activate, is_admin, user_id)
+                        WITH new_user AS (
+                            INSERT INTO {self.schema}.user (user_id, username, legacy_username, created_at, last_login)
+                            SELECT user_id, username, legacy_username, COALESCE(created_at, now()), last_login FROM legacy_users
+                            ON CONFLICT DO NOTHING
+                            RETURNING user_id
+                        ),
+                        new_auth AS (
+                            INSERT INTO {self.schema}.user_auth (user_id, api_key_hash)
+                            SELECT l.user_id, l.api_key_hash
+                            FROM legacy_users l
+                            JOIN new_user n ON n.user_id = l.user_id
+                        ),
+                        new_perm AS (
+                            INSERT INTO {self.schema}.user_perm (user_id, is_admin, activated)
+                            SELECT l.user_id, l.is_admin, l.activated
+                            FROM legacy_users l
+                            JOIN new_user n ON n.user_id = l.user_id
                         )
+                        SELECT user_id FROM new_user;
+                        """
+                    )
 
-                        if cur.rowcount == 0:
-                            raise NoUserPermEditedError("Error setting user perm record: No rows affected")
-                        
-                        conn.commit()
-                        return True
-
-                except NoUserPermEditedError:
-                    raise
-
-                except Exception as e:
-                    conn.rollback()
-                    if self._is_immutable_error(e):
-                        raise ImmutableException("Could not set user perm record: user is immutable")
-
-                    logger.error(f"Error setting perm record: {e}")
-
-                    raise UserPermEditError("Unexpected error setting user perm record.")
-
-    def _make_user_immutable(self, user_id: str):
-        """
-        Mark a user record as immutable.
-
-        Sets the `immutable` flag for the provided `user_id`. If the
-        update affects no rows an exception is raised. This helper wraps
-        the database call and normalizes the exception types raised by
-        the caller.
-
-        Args:
-            user_id: The UUID (string) of the user to mark immutable.
+                    created = {str(row["user_id"]) for row in cur.fetchall()}
 
-        Returns:
-            True on success.
-        """
-        with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor() as cur:
+                    # Owners of the usernames that were skipped (a row imported from the same legacy user is returned last)
                     cur.execute(
                         f"""
-                        UPDATE {self.schema}.user
-                        SET immutable = TRUE
-                        WHERE user_id = %s;
-                        """,
-                        (user_id,)
+                        SELECT l.legacy_username, u.username, u.legacy_username AS owner_legacy_username
+                        FROM legacy_users l
+                        JOIN {self.schema}.user u ON u.username = l.username OR u.legacy_username = l.legacy_username
+                        WHERE l.user_id <> u.user_id
+                        ORDER BY u.legacy_username IS NOT DISTINCT FROM l.legacy_username
+                        """
                     )
+                    owners = {row["legacy_username"]: row for row in cur.fetchall()}
 
-                    if cur.rowcount == 0:
-                        raise Exception("Error making user immutable: No rows affected")
-                        
-                    conn.commit()
-                    return True
+                for result in results:
+                    if result["status"] is None:
+                        if result["user_id"] in created:
+                            result["status"] = "created"
+                            continue
 
-            except NoUserPermEditedError:
-                raise
+                        # The generated key was never stored
+                        del result["user_id"], result["api_key"]
 
-            except Exception as e:
-                conn.rollback()
-                if self._is_immutable_error(e):
-                    raise ImmutableException("Could not set immutable value: user is already immutable (???)")
-
-                logger.error(f"Error making user immutable: {e}")
-
-                raise UserImmutableChangeError("Unexpected error while making user immutable.")
+                        owner = owners.get(result["legacy_username"])
+                        if owner is not None and owner["owner_legacy_username"] == result["legacy_username"]:
+                            # Imported by an earlier run
+                            result["status"] = "exists"
+                        else:
+                            result["status"] = "conflict"
+                            result["conflict_with"] = owner["username"] if owner is not None else None
 
-    def create_user(self, username: str, is_admin: bool, activate: bool, _immutable: bool = False) -> tuple:
-        """
-        Create a complete user including base record, auth data and permissions.
+                if on_created is not None:
+                    on_created([result for result in results if result["status"] == "created"])
 
-        Args:
-            username: The requested username (will be sanitized before storage).
-            is_admin: Whether the new user should have admin privileges.
-            activate: Whether the new user should be marked as activated.
-
-        Returns:
-            A tuple of (sanitized_username, user_id, api_key)
-
-        Raises:
-            UserRecordCreatinError:
-                If no user_id is returned in user record creation.
-            UserAuthCreationError:
-                If no api_key is returned in user auth creation.
-            UserPermEditError:
-                If no success return after setting user perm values.
-        """
-        sanitized_username = self._sanitize_username(username=username)
+                conn.commit()
 
-        user_id = self._create_user_record(username=sanitized_username)
-        if not user_id:
-            raise UserRecordCreationError("No user_id returned in self._create_user_record")
-        
-        api_key = self._create_user_auth_record(user_id=user_id)
-        if not api_key:
-            raise UserAuthCreationError("No api_key returned in self._set_user_perm_record")
-        
-        perm_record_set = self._set_user_perm_record(user_id=user_id, is_admin=is_admin, activate=activate)
-        if not perm_record_set:
-            raise UserPermEditError("No success return from self._set_user_perm_record")
+            except Exception as e:
+                logger.error(f"Error importing legacy users: {e}")
+                conn.rollback()
+                raise UserRecordCreationError("Unexpected error while importing legacy users")
 
-        if _immutable:
-            self._make_user_immutable(user_id=user_id)
+        for user_id, _, _, hashed_api_key, *_ in staged:
+            if str(user_id) in created:
+                api_key_filter.add(hashed_api_key)
 
-        return sanitized_username, user_id, api_key
+        return results
 
-    def update_user_perm(self, user_id: str, is_admin: bool = None, activated: bool = None) -> bool:
+    def _get_principal_by_api_key(self, hashed_api_key: bytes, key_prefix: str = None) -> dict:
         """
-        Update the permission flags for a user.
+        Resolve the principal for a hashed API key in a single query.
 
-        This function compares requested values to the current permission
-        record and issues an UPDATE only for fields that actually change.
+        Keys with a prefix (`<key_prefix>.<secret>`) are looked up in
+        `api_keys` by their indexed prefix and the stored hash is compared in
+        constant time afterwards. All other keys are looked up in `user_auth`
+        by hash. Both statements join `user_perm` and `user` on one connection
+        checkout and are prepared server-side because they run on every
+        authenticated request. Expired keys (rotation grace window over) are
+        filtered by the query itself.
 
         Args:
-            user_id: The UUID (string) of the user to update.
-            is_admin: Optional boolean to set admin flag.
-            activated: Optional boolean to set activation flag.
+            hashed_api_key: Raw HMAC digest of the API key.
+            key_prefix: Public prefix of the key, None for `user_auth` keys.
 
         Returns:
-            bool: True on successful update.
+            dict: {"user_id", "is_admin", "activated", "immutable", "key_id", "expires_in"}
+            (`key_id` is None for `user_auth` keys, `expires_in` is the number
+            of seconds until the key expires or None)
 
         Raises:
-            NoChangesNeeded: If no values were provided or no changes are required.
-            UserPermReadError: If the user's permission record cannot be loaded.
-        """
-        user_perm = self._get_user_perm_record(user_id=user_id)
-        if not user_perm:
-            raise UserPermReadError("User perm was not returned.")
-        
-        if is_admin is None and activated is None:
-                raise NoChangesNeeded("No values provided to update user_perm")
-
-        updates = []
-        values = []
-
-        if is_admin is not None:
-            if is_admin != user_perm["is_admin"]:
-                updates.append("is_admin = %s")
-                values.append(is_admin)
-
-        if activated is not None:
-            if activated != user_perm["activated"]:
-                updates.append("activated = %s")
-                values.append(activated)
-
-        if not updates:
-            raise NoChangesNeeded("No changes would be made in user_perm.")
-        
-        values.append(user_id)
-
-        query = f"""
-            UPDATE {self.schema}.user_perm
-            SET {", ".join(updates)}
-            WHERE user_id = %s
+            UserNotFoundError: If no user matches the key.
+            APIKeyLookupError: On unexpected errors during DB lookup.
         """
-
         with postgres_pool.get_connection() as conn:
             try:
-                with conn.cursor() as cur:
-                    cur.execute(query, values)
-
-                    if cur.rowcount == 0:
-                        raise NoRowsAffected("No rows where affected while updating user_perm")
-
-                conn.commit()
+                with conn.cursor(row_factory=dict_row) as cur:
+                    if key_prefix is None:
+                        cur.execute(
+                            f"""
+                            SELECT
+                                a.user_id,
+                                p.is_admin,
+                                p.activated,
+                                u.immutable,
+                                NULL::uuid AS key_id,
+                                EXTRACT(EPOCH FROM a.api_key_expires_at - now())::float8 AS expires_in
+                            FROM {self.schema}.user_auth AS a
+                            JOIN {self.schema}.user_perm AS p ON p.user_id = a.user_id
+                            JOIN {self.schema}.user AS u ON u.user_id = a.user_id
+                            WHERE a.api_key_hash = %s
+                                AND (a.api_key_expires_at IS NULL OR a.api_key_expires_at > now())
+                                AND p.deleted_at IS NULL
+                            LIMIT 1
+                            """, (hashed_api_key,), prepare=True)
+
+                        principal = cur.fetchone()
 
-            except NoRowsAffected:
-                conn.rollback()
-                raise
+                    else:
+                        cur.execute(
+                            f"""
+                            SELECT
+                                k.user_id,
+                                p.is_admin,
+                                p.activated,
+                                u.immutable,
+                                k.key_id,
+                                k.key_hash,
+                                EXTRACT(EPOCH FROM k.expires_at - now())::float8 AS expires_in
+                            FROM {self.schema}.api_keys AS k
+                            JOIN {self.schema}.user_perm AS p ON p.user_id = k.user_id
+                            JOIN {self.schema}.user AS u ON u.user_id = k.user_id
+                            WHERE k.key_prefix = %s
+                                AND NOT k.revoked
+                                AND (k.expires_at IS NULL OR k.expires_at > now())
+                                AND p.deleted_at IS NULL
+                            """, (key_prefix,), prepare=True)
+
+                        principal = cur.fetchone()
+
+                        if principal and not hmac.compare_digest(bytes(principal.pop("key_hash")), hashed_api_key):
+                            principal = None
 
             except Exception as e:
-                conn.rollback()
-                if self._is_immutable_error(e):
-                    raise ImmutableException("Could not update user_perm: user is immutable")
+                logger.error(f"Error resolving principal by api_key: {e}")
+                raise APIKeyLookupError("Unexpected error while performing api_key lookup")
 
-                raise
+        if not principal:
+            raise UserNotFoundError("User by api key could not be loaded")
 
-        return True
+        return principal
 
-    def delete_user(self, user_id: str) -> bool:
+    def iter_api_key_hashes(self, batch_size: int = 10000):
         """
-        Delete a user after validating existence and admin safety constraints.
-
-        Args:
-            user_id: The unique identifier of the user to delete.
+        Yield all stored API key hashes (`user_auth` and active `api_keys`).
 
-        Returns:
-            True if the user was successfully deleted.
-
-        Raises:
-            UserNotFoundError:
-                If no user or perm record exists for the given user_id
-            LastAdminError:
-                If the user is an admin and is the last active admin account.
-        """
-        user = self._get_user_record(user_id=user_id)
-        if user:
-            user_perm = self._get_user_perm_record(user_id=user_id)
-            if user_perm:
-                if user_perm["is_admin"]:
-                    if self._get_admin_count() <= 1:
-                        raise LastAdminError("Last active admin can not be deleted.")
-                    # Admin is not the last admin -> allow deletion
-                    return self._delete_user_record(user_id=user_id)
-                # Non-admin user -> allow deletion
-                return self._delete_user_record(user_id=user_id)
-
-        else:
-            raise UserNotFoundError("Requested user not found")
-
-    def list_users(self, page: int, limit: int) -> dict:
-        """
-        Return a paginated list of user records.
+        Uses a server-side cursor so memory stays flat for large user tables.
 
         Args:
-            page: 1-based page number.
-            limit: Maximum number of records per page.
+            batch_size: Number of rows fetched per round trip.
 
-        Returns:
-            list[dict]: List of user records (each is a dict of columns).
+        Yields:
+            bytes: Raw HMAC digest of a stored API key.
         """
-        offset = (page - 1) * limit
-
         with postgres_pool.get_connection() as conn:
-            try:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(f"""
-                                SELECT * FROM {self.schema}.user
-                                ORDER BY created_at DESC
-                                LIMIT %s OFFSET %s
-                                """, (limit, offset))
-
-                    return cur.fetchall()
-                
-            except Exception as e:
-                logger.error(f"Unexpected error while fetching users: {e}")
-                raise Exception("Unexpected error while fetching users")
-
-    def _get_user_id_by_api_key(self, hashed_api_key: str) -> str | bool:
-        """
-        Lookup the `user_id` for a given hashed API key.
+            with conn.cursor(name="api_key_hashes", row_factory=dict_row) as cur:
+                cur.itersize = batch_size
+                cur.execute(
+                    f"""
+                    SELECT api_key_hash AS key_hash FROM {self.schema}.user_auth
+                    WHERE api_key_hash IS NOT NULL
+                        AND (api_key_expires_at IS NULL OR api_key_expires_at > now())
+                    UNION ALL
+                    SELECT key_hash FROM {self.schema}.api_keys
+                    WHERE NOT revoked
+                        AND (expires_at IS NULL OR expires_at > now())
+                    """)
+
+                for row in cur:
+                    yield row["key_hash"]
+
+    def get_api_key_hashes(self, user_id: str) -> list:
+        """
+        Load all stored API key hashes of a user (`user_auth` and active `api_keys`).
 
         Args:
-            hashed_api_key: Hexadecimal HMAC hash of the API key.
+            user_id: The UUID (string) of the user.
 
         Returns:
-            str|None: user_id string if found, otherwise None.
+            list[bytes]: Raw HMAC digests (empty if the user has no key).
 
         Raises:
             APIKeyLookupError: On unexpected errors during DB lookup.
@@ -663,17 +429,22 @@ class UserDatabase:
                 with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(
                         f"""
-                        SELECT user_id FROM {self.schema}.user_auth
-                        WHERE api_key_hash = %s
-                        LIMIT 1
-                        """, (hashed_api_key,))
-                    
-                    row = cur.fetchone()
-                    return row["user_id"] if row else None
-            
+                        SELECT api_key_hash AS key_hash FROM {self.schema}.user_auth
+                        WHERE user_id = %s
+                            AND api_key_hash IS NOT NULL
+                            AND (api_key_expires_at IS NULL OR api_key_expires_at > now())
+                        UNION ALL
+                        SELECT key_hash FROM {self.schema}.api_keys
+                        WHERE user_id = %s
+                            AND NOT revoked
+                            AND (expires_at IS NULL OR expires_at > now())
+                        """, (user_id, user_id))
+
+                    return [row["key_hash"] for row in cur.fetchall()]
+
             except Exception as e:
-                logger.error(f"Error checking for api_key existence: {e}")
-                raise APIKeyLookupError("Unexpected error while performing api_key lookup")
+                logger.error(f"Error loading api_key hashes: {e}")
+                raise APIKeyLookupError("Unexpected error while loading api_key hashes")
 
     def get_user_perm_by_api_key(self, api_key: str) -> dict:
         """
@@ -681,13 +452,16 @@ class UserDatabase:
 
         The method hashes the provided API key using the configured
         `API_KEY_SECRET` and looks up the associated user permission
-        record in the database.
+        record in the database. Resolved records are kept in the
+        `principal_cache` so repeated requests skip the database, and
+        keys rejected by the `api_key_filter` never reach it.
 
         Args:
             api_key: Plain API key string as provided by the client.
 
         Returns:
-            dict: User permission record for the matched user.
+            dict: User permission record for the matched user
+            (`user_id`, `is_admin`, `activated`, `immutable`, `key_id`).
 
         Raises:
             APIKeyEmptyError: If `api_key` is empty or falsy.
@@ -700,37 +474,28 @@ class UserDatabase:
         hashed_api_key = self._hash_api_key(api_key=api_key)
         if not hashed_api_key:
             raise KeyHashError("No hashed API key was returned")
-        
-        user_id = self._get_user_id_by_api_key(hashed_api_key=hashed_api_key)
-        if not user_id:
-            raise UserNotFoundError("User id by api key could not be loaded")
 
-        user = self._get_user_perm_record(user_id=user_id)
+        # Serve repeated lookups from the in-process cache
+        cached_user = principal_cache.get(hashed_api_key)
+        if cached_user is not None:
+            return cached_user
 
-        return user
+        # Reject keys that are definitely not stored without touching the database
+        if not api_key_filter.might_contain(hashed_api_key):
+            raise UserNotFoundError("User by api key could not be loaded")
 
-    def get_user_by_user_id(self, user_id: str) -> dict:
-        """
-        Load full user and permission records by `user_id`.
+        # Remember the cache epoch so an invalidation during the lookup is not overwritten
+        cache_epoch = principal_cache.epoch()
 
-        Returns a combined dictionary containing `user_id`, the user
-        record (without the duplicated `user_id` field) and the
-        associated `user_perm` record.
+        key_prefix = self._get_api_key_prefix(api_key=api_key)
+        user = self._get_principal_by_api_key(hashed_api_key=hashed_api_key, key_prefix=key_prefix)
 
-        Args:
-            user_id: The UUID (string) of the user to load.
+        # Keys in a rotation grace window must not outlive their expiry in the cache
+        expires_in = user.pop("expires_in", None)
 
-        Returns:
-            dict: {"user_id": <id>, "user": <user_record>, "user_perm": <perm_record>}
-        """
-        user_record = self._get_user_record(user_id=user_id)
-        user_perm_record = self._get_user_perm_record(user_id=user_id)
-        
-        # Remove unnecessary user_id from user recods
-        user_record.pop("user_id", None)
-        user_perm_record.pop("user_id", None)
+        principal_cache.set(hashed_api_key, owner=user["user_id"], value=user, epoch=cache_epoch, ttl=expires_in)
 
-        return {"user_id": user_id, "user": user_record, "user_perm": user_perm_record}
+        return user
 
     def create_init_user(self) -> None:
         """
@@ -787,6 +552,7 @@ class UserDatabase:
             
                 logger.info("Database Flushed...")
                 conn.commit()
+                principal_cache.clear()
 
             except NoRowsAffected:
                 raise
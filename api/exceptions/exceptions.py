@@ -62,10 +62,26 @@ class APIKeyLookupError(Exception):
     """Raised when an unexpected error happens while checking for api key existence"""
     pass
 
+class APIKeyNotFoundError(Exception):
+    """Raised when an API key (key_id) does not exist for the user"""
+    pass
+
+class APIKeyLimitError(Exception):
+    """Raised when a user already has the maximum number of API keys"""
+    pass
+
+class APIKeyRotationInProgressError(Exception):
+    """Raised when an API key is rotated again while it is still in its grace window"""
+    pass
+
 class APIKeyEmptyError(Exception):
     """Raised when an empty API key is sent to the server via a header value"""
     pass
 
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor can not be decoded"""
+    pass
+
 class NoChangesNeeded(Exception):
     """Raised when a database operation would not change any data"""
     pass
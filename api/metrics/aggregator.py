@@ -10,7 +10,10 @@ global_data = {
     "errors": 0,
 }
 
-def record(route: str, duration: float, status: int):
+# Per user totals (only sums, so memory stays O(active users) per flush interval)
+user_data = defaultdict(lambda: {"count": 0, "errors": 0, "total_time": 0.0, "bytes": 0})
+
+def record(route: str, duration: float, status: int, user_id: str = None, response_bytes: int = 0):
     route_data[route].append(duration)
     status_counts[(route, status)] += 1
 
@@ -19,6 +22,15 @@ def record(route: str, duration: float, status: int):
     if status >= 500:
         global_data["errors"] += 1
 
+    # Only authenticated requests can be attributed to a user
+    if user_id is not None:
+        usage = user_data[str(user_id)]
+        usage["count"] += 1
+        usage["total_time"] += duration
+        usage["bytes"] += response_bytes
+        if status >= 500:
+            usage["errors"] += 1
+
 
 def summarize():
     summary = {}
@@ -53,7 +65,12 @@ def summarize():
     return summary, status_counts.copy(), global_summary
 
 
+def summarize_users():
+    return {user_id: dict(usage) for user_id, usage in user_data.items()}
+
+
 def reset():
     route_data.clear()
     status_counts.clear()
+    user_data.clear()
     global_data.update({"count": 0, "total_time": 0, "errors": 0})
\ No newline at end of file
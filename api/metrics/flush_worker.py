@@ -1,6 +1,6 @@
 import asyncio
 from datetime import datetime, timezone
-from api.metrics.aggregator import summarize, reset
+from api.metrics.aggregator import summarize, summarize_users, reset
 
 from api.database.metric_database.metric_database import metric_database
 
@@ -21,6 +21,11 @@ async def flush_loop():
 
         try:
             summary, status_counts, global_summary = summarize()
+            user_usage = summarize_users()
+
+            # Swap out the buckets before writing, a failed write must never replay already written counters
+            reset()
+
             now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
 
             # Route metrics
@@ -50,8 +55,19 @@ async def flush_loop():
             # Global metrics
             metric_database.insert_global_metrics(now=now, global_summary=global_summary)
 
-            reset()
-
+            # Per user usage
+            user_rows = [
+                (
+                    now,
+                    user_id,
+                    usage["count"],
+                    usage["errors"],
+                    usage["total_time"],
+                    usage["bytes"],
+                )
+                for user_id, usage in user_usage.items()
+            ]
+            metric_database.insert_user_usage(user_rows=user_rows)
 
             flush_health.record_success()
 
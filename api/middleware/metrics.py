@@ -20,12 +20,20 @@ def add_metrics_middleware(app):
             route = re.sub(r'[^a-zA-Z0-9/_.-]', '', route) # Prevent Nul bytes and other stuff that postgreSQL can't handle
             status = response.status_code
 
+            # Streamed responses have no Content-Length and count as 0 bytes
+            response_bytes = int(response.headers.get("content-length") or 0)
+
         except Exception:
             status = 500
+            response_bytes = 0
             raise
 
         finally:
             duration = time.perf_counter() - start
-            record(route, duration, status)
+
+            # Set by the auth dependency for authenticated requests
+            user_id = getattr(request.state, "user_id", None)
+
+            record(route, duration, status, user_id=user_id, response_bytes=response_bytes)
 
         return response
\ No newline at end of file
@@ -4,7 +4,7 @@ API models for user metric related requests
 
 from pydantic import Field, model_validator, field_validator
 from api.models.base import SecureBaseModel as BaseModel
-from typing import Optional
+from typing import Optional, Literal
 from datetime import datetime, timezone
 
 
@@ -164,4 +164,42 @@ class RouteStatusCodeMetricsRerquest(BaseModel):
     def prevent_future_dates(cls, value):
         if value and value > datetime.now(timezone.utc):
             raise ValueError("Datetime cannot be in the future")
-        return value
\ No newline at end of file
+        return value
+
+class TopConsumersRequest(BaseModel):
+    start: Optional[datetime] = Field(
+        default=None,
+        description="Start of the time range (ISO 8601)",
+        example="2026-02-18T10:00:00"
+    )
+
+    end: Optional[datetime] = Field(
+        default=None,
+        description="End of the time range (ISO 8601)",
+        example="2026-02-18T12:00:00"
+    )
+
+    order_by: Literal["requests", "errors", "response_time", "response_bytes"] = Field(
+        default="requests",
+        description="Usage value the users are ranked by"
+    )
+
+    limit: int = Field(
+        default=10,
+        ge=1,
+        le=100,
+        description="Maximum number of users returned (1-100)"
+    )
+
+    @model_validator(mode="after")
+    def validate_time_range(self):
+        if self.start and self.end:
+            if self.start > self.end:
+                raise ValueError("start must be before end")
+        return self
+
+    @field_validator("start", "end")
+    def prevent_future_dates(cls, value):
+        if value and value > datetime.now(timezone.utc):
+            raise ValueError("Datetime cannot be in the future")
+        return value
@@ -1,10 +1,11 @@
 """
 API models for user related requests
 """
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from api.models.base import SecureBaseModel as BaseModel
 from uuid import UUID
-from api.config.config import USERNAME_MIN_LENGTH, USERNAME_MAX_LENGTH
+from typing import Optional
+from api.config.config import USERNAME_MIN_LENGTH, USERNAME_MAX_LENGTH, BULK_REGISTER_MAX_USERS, BULK_PERM_UPDATE_MAX_USERS
 
 class UserRegisterRequest(BaseModel):
     """
@@ -14,6 +15,12 @@ class UserRegisterRequest(BaseModel):
     is_admin: bool = Field(default=False)
     activate: bool = Field(default=False)
 
+class UserBulkRegisterRequest(BaseModel):
+    """
+    Data model to register many users at once
+    """
+    users: list[UserRegisterRequest] = Field(..., min_length=1, max_length=BULK_REGISTER_MAX_USERS)
+
 class UserDeleteRequest(BaseModel):
     user_id: str = Field(
         default="me",
@@ -31,4 +38,28 @@ class UserDeleteRequest(BaseModel):
             UUID(v)
             return v
         except ValueError:
-            raise ValueError("user_id must be 'me' or a valid UUID")
\ No newline at end of file
+            raise ValueError("user_id must be 'me' or a valid UUID")
+
+class UserBulkPermUpdateRequest(BaseModel):
+    """
+    Data model to update the permissions of many users at once
+    """
+    user_ids: list[str] = Field(..., min_length=1, max_length=BULK_PERM_UPDATE_MAX_USERS)
+    is_admin: Optional[bool] = Field(default=None)
+    activated: Optional[bool] = Field(default=None)
+
+    @field_validator("user_ids")
+    @classmethod
+    def validate_user_ids(cls, v: list[str]) -> list[str]:
+        try:
+            for user_id in v:
+                UUID(user_id)
+            return v
+        except ValueError:
+            raise ValueError("user_ids must only contain valid UUIDs")
+
+    @model_validator(mode="after")
+    def validate_changes(self):
+        if self.is_admin is None and self.activated is None:
+            raise ValueError("is_admin or activated must be set")
+        return self
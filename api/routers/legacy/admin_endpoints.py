@@ -19,6 +19,12 @@ async def list_users(request: Request, user_data = get_user_role("admin")):
     users = user_db.list_users()
     return {"users": users}
 
+@router.get("/users/unfingerprinted", description="Returns the active users whose API key still needs the slow scan (not used since the key fingerprint migration).")
+@limiter.limit("5/minute")
+async def list_unfingerprinted_users(request: Request, user_data = get_user_role("admin")):
+    usernames = user_db.list_unfingerprinted_users()
+    return {"count": len(usernames), "usernames": usernames}
+
 @router.post("/user/create", description="Creates a new user with the specified username, role, and optional API key.")
 @limiter.limit("5/minute")
 async def create_user(request: Request, username: str, role: UserRole, api_key: str = "", user_data = get_user_role("admin")):
@@ -26,4 +32,13 @@ async def create_user(request: Request, username: str, role: UserRole, api_key:
     if not user:
         raise HTTPException(status_code=400, detail="User creation failed or user already exists")
 
-    return {"user": {"username": username, "role": role.value, "api_key": user}}
\ No newline at end of file
+    return {"user": {"username": username, "role": role.value, "api_key": user}}
+
+@router.post("/user/reissue-key", description="Replaces the API key of a user with a new generated key. Use it for users who have not logged in since the key fingerprint migration.")
+@limiter.limit("5/minute")
+async def reissue_user_key(request: Request, username: str, user_data = get_user_role("admin")):
+    api_key = user_db.reissue_api_key(username)
+    if not api_key:
+        raise HTTPException(status_code=400, detail="Key reissue failed or user does not exist")
+
+    return {"user": {"username": username, "api_key": api_key}}
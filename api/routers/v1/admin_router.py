@@ -1,5 +1,6 @@
 # FastAPI imports
-from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 # Rate limiting
 from api.limiter.limiter import limiter
@@ -8,7 +9,11 @@ from api.limiter.limiter import limiter
 from api.utils.check_class_readiness import ensure_class_ready
 
 # Database
-from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
+from api.database.audit_database.audit_database import audit_database
+
+# Audit log
+from api.services.audit_log import audit_log
 
 # Logging
 from api.logger.logger import logger
@@ -19,10 +24,26 @@ from api.auth.auth import get_current_admin_perm
 # Import UUID
 from uuid import UUID
 
+# Typing
+from typing import Literal
+
+# Datetime for time filters
+from datetime import datetime
+
+# JSON encoding for streamed responses
+import json
+
+# Models
+from api.models.user import UserBulkRegisterRequest, UserBulkPermUpdateRequest
+
+# Configuration
+from api.config.config import USER_EXPORT_BATCH_SIZE, USERNAME_MAX_LENGTH
+
 # Exceptions
 from api.exceptions.exceptions import *
 
-check_database_ready = lambda: ensure_class_ready(user_database, name="Userdatabase")
+check_database_ready = lambda: ensure_class_ready(async_user_database, name="Userdatabase")
+check_audit_database_ready = lambda: ensure_class_ready(audit_database, name="AuditDatabase")
 
 router = APIRouter(
     prefix="/admin",
@@ -30,16 +51,127 @@ router = APIRouter(
     dependencies=[Depends(check_database_ready)]
 )
 
-@router.get("/users", description="Get a full list of users.")
+@router.get("/users", description="Get a full list of users. The cursor for the next page is returned in the X-Next-Cursor header.")
 @limiter.limit("10/minute")
-async def list_users(request: Request, page: int = Query(1, ge=1), limit: int = Query(50, ge=1, le=100), _ = Depends(get_current_admin_perm)):
+async def list_users(request: Request, response: Response, page: int = Query(1, ge=1), limit: int = Query(50, ge=1, le=100), cursor: str | None = Query(None, max_length=256), _ = Depends(get_current_admin_perm)):
     try:
-        return user_database.list_users(page=page, limit=limit)
+        users, next_cursor = await async_user_database.list_users(page=page, limit=limit, cursor=cursor)
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        return users
+
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
     except Exception as e:
         logger.error(f"Unexpected error while fetching users: {e}")
         raise HTTPException(status_code=500, detail="Unexpected error while fetching users")
     
+@router.get("/stats", description="Get user totals (total, activated and active admin users).")
+@limiter.limit("30/minute")
+async def user_stats(request: Request, _ = Depends(get_current_admin_perm)):
+    try:
+        return await async_user_database.get_user_stats()
+
+    except UserRecordReadError:
+        raise HTTPException(status_code=500, detail="User stats could not be read")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while fetching user stats: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while fetching user stats")
+
+@router.get("/users/search", description="Search users by username prefix or substring. The cursor for the next page is returned in the X-Next-Cursor header.")
+@limiter.limit("30/minute")
+async def search_users(request: Request, response: Response, q: str = Query(..., min_length=1, max_length=USERNAME_MAX_LENGTH), mode: Literal["prefix", "substring"] = Query("prefix"), limit: int = Query(20, ge=1, le=100), cursor: str | None = Query(None, max_length=256), _ = Depends(get_current_admin_perm)):
+    try:
+        users, next_cursor = await async_user_database.search_users(query=q, mode=mode, limit=limit, cursor=cursor)
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        return users
+
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while searching users: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while searching users")
+
+@router.get("/audit", description="Get audit events (user, permission and API key changes), newest first. The cursor for the next page is returned in the X-Next-Cursor header.", dependencies=[Depends(check_audit_database_ready)])
+@limiter.limit("10/minute")
+async def list_audit_events(request: Request, response: Response, start: datetime | None = Query(None), end: datetime | None = Query(None), action: str | None = Query(None, max_length=64), actor_user_id: UUID | None = Query(None), target_user_id: UUID | None = Query(None), limit: int = Query(100, ge=1, le=1000), cursor: str | None = Query(None, max_length=256), _ = Depends(get_current_admin_perm)):
+    try:
+        events, next_cursor = await audit_database.get_events(
+            start=start,
+            end=end,
+            action=action,
+            actor_user_id=actor_user_id,
+            target_user_id=target_user_id,
+            limit=limit,
+            cursor=cursor
+        )
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        return events
+
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while fetching audit events: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while fetching audit events")
+
+@router.get("/users/export", description="Export all users with their permissions as NDJSON (streamed).")
+@limiter.limit("2/minute")
+async def export_users(request: Request, _ = Depends(get_current_admin_perm)):
+    async def stream():
+        try:
+            async for rows in async_user_database.iter_users_with_perm(batch_size=USER_EXPORT_BATCH_SIZE):
+                yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+        except Exception as e:
+            # The status code was already sent, the client sees a truncated stream
+            logger.error(f"Unexpected error while exporting users: {e}")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.patch("/users/perm", description="Change role and/or activation of many users at once.")
+@limiter.limit("10/minute")
+async def bulk_update_user_perm(request: Request, perm_info: UserBulkPermUpdateRequest, user_perm = Depends(get_current_admin_perm)):
+    try:
+        results = await async_user_database.bulk_update_user_perm(
+            user_ids=perm_info.user_ids,
+            acting_user_id=user_perm["user_id"],
+            is_admin=perm_info.is_admin,
+            activated=perm_info.activated
+        )
+
+        for result in results:
+            if result["status"] == "updated":
+                audit_log.record(
+                    "user.perm_update",
+                    actor_user_id=user_perm["user_id"],
+                    target_user_id=result["user_id"],
+                    details={"is_admin": perm_info.is_admin, "activated": perm_info.activated, "bulk": True}
+                )
+
+        return {
+            "updated": sum(1 for result in results if result["status"] == "updated"),
+            "results": results
+        }
+
+    except ImmutableException:
+        raise HTTPException(status_code=403, detail="Can't update users: an immutable user was affected")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while bulk updating user perms: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while bulk updating user perms.")
+
 @router.patch("/users/{user_id}/role")
 @limiter.limit("10/minute")
 async def change_user_role(request: Request, user_id: UUID, is_admin: bool = False, user_perm = Depends(get_current_admin_perm)):
@@ -47,7 +179,8 @@ async def change_user_role(request: Request, user_id: UUID, is_admin: bool = Fal
         if user_id == user_perm["user_id"]:
             raise HTTPException(status_code=403, detail="Can't change your own admin perm.")
 
-        success = user_database.update_user_perm(user_id=user_id, is_admin=is_admin)
+        success = await async_user_database.update_user_perm(user_id=user_id, is_admin=is_admin)
+        audit_log.record("user.role_change", actor_user_id=user_perm["user_id"], target_user_id=user_id, details={"is_admin": is_admin})
         return {"success": success, "user_id": user_id, "is_admin": is_admin}
 
     except NoChangesNeeded:
@@ -71,9 +204,10 @@ async def change_user_role(request: Request, user_id: UUID, is_admin: bool = Fal
     
 @router.patch("/users/{user_id}/activate")
 @limiter.limit("10/minute")
-async def activate_user(request: Request, user_id: UUID, _ = Depends(get_current_admin_perm)):
+async def activate_user(request: Request, user_id: UUID, user_perm = Depends(get_current_admin_perm)):
     try:
-        success = user_database.update_user_perm(user_id=user_id, activated=True)
+        success = await async_user_database.update_user_perm(user_id=user_id, activated=True)
+        audit_log.record("user.activate", actor_user_id=user_perm["user_id"], target_user_id=user_id)
         return {"success": success, "user_id": user_id}
 
     except NoChangesNeeded:
@@ -99,7 +233,8 @@ async def deactivate_user(request: Request, user_id: UUID, user_perm = Depends(g
         if user_id == user_perm["user_id"]:
             raise HTTPException(status_code=403, detail="Can't deactivate own admin account.")
 
-        success = user_database.update_user_perm(user_id=user_id, activated=False)
+        success = await async_user_database.update_user_perm(user_id=user_id, activated=False)
+        audit_log.record("user.deactivate", actor_user_id=user_perm["user_id"], target_user_id=user_id)
         return {"success": success, "user_id": user_id}
 
     except NoChangesNeeded:
@@ -119,4 +254,72 @@ async def deactivate_user(request: Request, user_id: UUID, user_perm = Depends(g
 
     except Exception as e:
         logger.error(f"Unexpected error while deactivating user: {e}")
-        raise HTTPException(status_code=500, detail="Unexpected error while deactivating user.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Unexpected error while deactivating user.")
+
+@router.post("/users/{user_id}/restore", description="Restore a deleted user that was not purged yet.")
+@limiter.limit("10/minute")
+async def restore_user(request: Request, user_id: UUID, user_perm = Depends(get_current_admin_perm)):
+    try:
+        success = await async_user_database.restore_user(user_id=user_id)
+        audit_log.record("user.restore", actor_user_id=user_perm["user_id"], target_user_id=user_id)
+        return {"success": success, "user_id": user_id}
+
+    except UserNotFoundError:
+        raise HTTPException(status_code=404, detail="No deleted user with this user_id found (it may already be purged).")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while restoring user: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while restoring user.")
+
+@router.post("/users/bulk", description="Register many users at once in one transaction. Returns one result (including the API key of created users) per requested user.")
+@limiter.limit("2/minute")
+async def bulk_register_users(request: Request, bulk_info: UserBulkRegisterRequest, user_perm = Depends(get_current_admin_perm)):
+    try:
+        results = await async_user_database.bulk_create_users(users=[user.model_dump() for user in bulk_info.users])
+
+    except KeyHashError:
+        raise HTTPException(status_code=500, detail="User auth records could not be set")
+
+    except UserRecordCreationError:
+        raise HTTPException(status_code=500, detail="User records could not be created")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while bulk creating users: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while bulk creating users.")
+
+    for result in results:
+        if result["status"] == "created":
+            audit_log.record("user.register", actor_user_id=user_perm["user_id"], target_user_id=result["user_id"], details={"username": result["username"], "bulk": True})
+
+    return {
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "results": results
+    }
+
+@router.get("/users/{user_id}/keys", description="List the additional API keys of a user.")
+@limiter.limit("10/minute")
+async def list_user_api_keys(request: Request, user_id: UUID, _ = Depends(get_current_admin_perm)):
+    try:
+        return await async_user_database.list_api_keys(user_id=user_id)
+
+    except Exception as e:
+        logger.error(f"Unexpected error while listing api keys: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while listing API keys.")
+
+@router.delete("/users/{user_id}/keys/{key_id}", description="Revoke an additional API key of a user.")
+@limiter.limit("10/minute")
+async def revoke_user_api_key(request: Request, user_id: UUID, key_id: UUID, user_perm = Depends(get_current_admin_perm)):
+    try:
+        await async_user_database.revoke_api_key(user_id=user_id, key_id=key_id)
+        audit_log.record("api_key.revoke", actor_user_id=user_perm["user_id"], target_user_id=user_id, details={"key_id": str(key_id)})
+        return {"detail": "API key revoked", "user_id": user_id, "key_id": key_id}
+
+    except APIKeyNotFoundError:
+        raise HTTPException(status_code=404, detail="API key not found.")
+
+    except NoChangesNeeded:
+        raise HTTPException(status_code=409, detail="API key is already revoked.")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while revoking api key: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while revoking API key.")
@@ -16,10 +16,21 @@ from api.metrics.health import flush_health
 
 from api.database.postgres_pool import postgres_pool
 
+from api.cache.principal_cache import principal_cache
+from api.cache.api_key_filter import api_key_filter
+from api.cache.user_change_listener import user_change_listener
+
 from api.database.migrate import migration_needed
 
+from api.database.async_postgres_pool import async_postgres_pool
+
 from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
 from api.database.metric_database.metric_database import metric_database
+from api.database.audit_database.audit_database import audit_database
+
+from api.services.audit_log import audit_log
+from api.services.user_purge import purge_stats
 
 router = APIRouter(
     prefix="/health",
@@ -56,14 +67,37 @@ async def database_metrics(request: Request, _ = Depends(get_current_admin_perm)
                 "ready": postgres_pool.is_ready(),
                 "migration_needed": migration_needed()
             },
+            "async_pool": async_postgres_pool.stats(),
             "user_database": {
                 "ready": user_database.is_ready()
             },
+            "async_user_database": {
+                "ready": async_user_database.is_ready(),
+                "purge": purge_stats
+            },
             "metric_database": {
                 "ready": metric_database.is_ready()
+            },
+            "audit_database": {
+                "ready": audit_database.is_ready(),
+                "queue": audit_log.stats()
             }
         }
     
     except Exception as e:
         logger.error(f"Unexpected error while returning database health: {e}")
-        raise HTTPException(status_code=500, detail="Unexpected error while returning database health")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Unexpected error while returning database health")
+    
+@router.get("/auth-cache")
+@limiter.limit("10/minute")
+async def auth_cache_metrics(request: Request, _ = Depends(get_current_admin_perm)):
+    try:
+        return {
+            "principal_cache": principal_cache.stats(),
+            "api_key_filter": api_key_filter.stats(),
+            "user_change_listener": user_change_listener.stats()
+        }
+    
+    except Exception as e:
+        logger.error(f"Unexpected error while returning auth cache health: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while returning auth cache health")
\ No newline at end of file
@@ -76,4 +76,17 @@ async def status_code_metrics(request: Request, params: RouteStatusCodeMetricsRe
     
     except Exception as e:
         logger.error(f"Unexpected error while loading route status code metrics: {e}")
-        raise HTTPException(status_code=500, detail="Unexpected error while loading route status code metrics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Unexpected error while loading route status code metrics")
+
+@router.get("/users/top", description="Get the users with the highest usage (requests, errors, response time or response bytes) in a time range.")
+@limiter.limit("10/minute")
+async def top_consumers(request: Request, params: TopConsumersRequest = Depends(), _ = Depends(get_current_admin_perm)):
+    try:
+        return metric_database.get_top_consumers(start=params.start,
+                                                 end=params.end,
+                                                 order_by=params.order_by,
+                                                 limit=params.limit)
+
+    except Exception as e:
+        logger.error(f"Unexpected error while loading top consumers: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while loading top consumers")
@@ -1,5 +1,5 @@
 # FastAPI imports
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
 
 # Rate limiting
 from api.limiter.limiter import limiter
@@ -8,11 +8,14 @@ from api.limiter.limiter import limiter
 from api.utils.check_class_readiness import ensure_class_ready
 
 # Database
-from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
 
 # Models
 from api.models.user import UserRegisterRequest, UserDeleteRequest
 
+# Audit log
+from api.services.audit_log import audit_log
+
 # Logging
 from api.logger.logger import logger
 
@@ -23,7 +26,13 @@ from psycopg.errors import UniqueViolation
 
 from api.auth.auth import get_current_admin_perm, get_current_user_perm
 
-check_database_ready = lambda: ensure_class_ready(user_database, name="UserDatabase")
+# Configuration
+from api.config.config import API_KEYS_MAX_PER_USER, API_KEY_ROTATION_GRACE_PERIOD, API_KEY_ROTATION_MAX_GRACE_PERIOD
+
+# Import UUID
+from uuid import UUID
+
+check_database_ready = lambda: ensure_class_ready(async_user_database, name="UserDatabase")
 #create_init_user = lambda: user_database.create_init_user()
 
 router = APIRouter(
@@ -35,9 +44,10 @@ router = APIRouter(
 
 @router.post("/register", description="Register a new user if you are admin.")
 @limiter.limit("5/minute")
-async def register_user(request: Request, user_info: UserRegisterRequest, _ = Depends(get_current_admin_perm)):
+async def register_user(request: Request, user_info: UserRegisterRequest, user_perm = Depends(get_current_admin_perm)):
     try:
-        username, user_id, plain_api_key = user_database.create_user(username=user_info.username, is_admin=user_info.is_admin, activate=user_info.activate)
+        username, user_id, plain_api_key = await async_user_database.create_user(username=user_info.username, is_admin=user_info.is_admin, activate=user_info.activate)
+        audit_log.record("user.register", actor_user_id=user_perm["user_id"], target_user_id=user_id, details={"username": username, "is_admin": user_info.is_admin, "activated": user_info.activate})
         return {"username": username, "user_id": user_id, "api_key": plain_api_key}
    
     except UserRecordCreationError:
@@ -56,14 +66,15 @@ async def register_user(request: Request, user_info: UserRegisterRequest, _ = De
         logger.error(f"Unexpected error while creating user: {e}")
         raise HTTPException(status_code=500, detail="Unexpected error while creating user.")
 
-@router.delete("/delete", description="Delete current user or other user (if you are admin).")
+@router.delete("/delete", description="Delete current user or other user (if you are admin). Deleted users can be restored by an admin until they are purged.")
 @limiter.limit("5/minute")
 async def delete_user_account(request: Request, user_info: UserDeleteRequest, user_perm = Depends(get_current_user_perm)):
     try:
         # User wants to delete himself => Normal user perms required
         if user_info.user_id.lower() == "me" or user_info.user_id == user_perm["user_id"]:
-            if not user_database.delete_user(user_id=user_perm["user_id"]):
+            if not await async_user_database.delete_user(user_id=user_perm["user_id"]):
                 raise UserDeletionError("User not deleted")
+            audit_log.record("user.delete", actor_user_id=user_perm["user_id"], target_user_id=user_perm["user_id"])
             return {"detail": "User deleted"}
 
         # User wants to delete other user => Admin user perms required
@@ -71,8 +82,9 @@ async def delete_user_account(request: Request, user_info: UserDeleteRequest, us
         get_current_admin_perm(user_perm)
 
         # Deletion after admin validation
-        if not user_database.delete_user(user_id=user_info.user_id):
+        if not await async_user_database.delete_user(user_id=user_info.user_id):
             raise UserDeletionError("User not deleted")
+        audit_log.record("user.delete", actor_user_id=user_perm["user_id"], target_user_id=user_info.user_id)
         return {"detail": "User deleted"}
 
     except LastAdminError:
@@ -92,8 +104,92 @@ async def delete_user_account(request: Request, user_info: UserDeleteRequest, us
 @limiter.limit("10/minute")
 async def get_user_account(request: Request, user_perm = Depends(get_current_user_perm)):
     try:
-        return user_database.get_user_by_user_id(user_id=user_perm["user_id"])
+        return await async_user_database.get_user_by_user_id(user_id=user_perm["user_id"])
     
     except Exception as e:
         logger.error(f"Unexpected error while loading your user's profile")
-        raise HTTPException(status_code=500, detail="Unexpected error while loading your profile.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Unexpected error while loading your profile.")
+
+@router.get("/keys", description="List your additional API keys.")
+@limiter.limit("10/minute")
+async def list_api_keys(request: Request, user_perm = Depends(get_current_user_perm)):
+    try:
+        return await async_user_database.list_api_keys(user_id=user_perm["user_id"])
+
+    except Exception as e:
+        logger.error(f"Unexpected error while listing api keys: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while listing API keys.")
+
+@router.post("/keys", description="Create an additional API key. The key is only shown once.")
+@limiter.limit("5/minute")
+async def create_api_key(request: Request, user_perm = Depends(get_current_user_perm)):
+    try:
+        key = await async_user_database.create_api_key(user_id=user_perm["user_id"], max_keys=API_KEYS_MAX_PER_USER)
+        audit_log.record("api_key.create", actor_user_id=user_perm["user_id"], target_user_id=user_perm["user_id"], details={"key_id": str(key["key_id"])})
+        return key
+
+    except APIKeyLimitError:
+        raise HTTPException(status_code=409, detail=f"You already have {API_KEYS_MAX_PER_USER} active API keys")
+
+    except (UserAuthCreationError, KeyHashError):
+        raise HTTPException(status_code=500, detail="API key could not be created")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while creating api key: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while creating API key.")
+
+@router.post("/keys/rotate", description="Issue a new API key and let the old one expire after a grace period. Rotates the key used for this request unless key_id is given.")
+@limiter.limit("5/minute")
+async def rotate_api_key(request: Request, key_id: UUID | None = Query(None), grace_period: float = Query(API_KEY_ROTATION_GRACE_PERIOD, ge=0, le=API_KEY_ROTATION_MAX_GRACE_PERIOD), user_perm = Depends(get_current_user_perm)):
+    try:
+        key = await async_user_database.rotate_api_key(
+            user_id=user_perm["user_id"],
+            max_keys=API_KEYS_MAX_PER_USER,
+            key_id=key_id or user_perm.get("key_id"),
+            grace_period=grace_period
+        )
+        audit_log.record(
+            "api_key.rotate",
+            actor_user_id=user_perm["user_id"],
+            target_user_id=user_perm["user_id"],
+            details={
+                "key_id": str(key["key_id"]),
+                "rotated_key_id": str(key["rotated_key_id"]) if key["rotated_key_id"] else None,
+                "grace_period": grace_period
+            }
+        )
+        return key
+
+    except APIKeyNotFoundError:
+        raise HTTPException(status_code=404, detail="No active API key to rotate.")
+
+    except APIKeyRotationInProgressError:
+        raise HTTPException(status_code=409, detail="API key is already being rotated.")
+
+    except APIKeyLimitError:
+        raise HTTPException(status_code=409, detail=f"You already have {API_KEYS_MAX_PER_USER} active API keys")
+
+    except (UserAuthCreationError, KeyHashError):
+        raise HTTPException(status_code=500, detail="API key could not be rotated")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while rotating api key: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while rotating API key.")
+
+@router.delete("/keys/{key_id}", description="Revoke one of your additional API keys.")
+@limiter.limit("10/minute")
+async def revoke_api_key(request: Request, key_id: UUID, user_perm = Depends(get_current_user_perm)):
+    try:
+        await async_user_database.revoke_api_key(user_id=user_perm["user_id"], key_id=key_id)
+        audit_log.record("api_key.revoke", actor_user_id=user_perm["user_id"], target_user_id=user_perm["user_id"], details={"key_id": str(key_id)})
+        return {"detail": "API key revoked", "key_id": key_id}
+
+    except APIKeyNotFoundError:
+        raise HTTPException(status_code=404, detail="API key not found.")
+
+    except NoChangesNeeded:
+        raise HTTPException(status_code=409, detail="API key is already revoked.")
+
+    except Exception as e:
+        logger.error(f"Unexpected error while revoking api key: {e}")
+        raise HTTPException(status_code=500, detail="Unexpected error while revoking API key.")
\ No newline at end of file
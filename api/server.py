@@ -28,6 +28,9 @@ from api.limiter.limiter import limiter
 # Import database startup functions
 from api.database.startup import startup_database
 
+# Import async connection pool (request path)
+from api.database.async_postgres_pool import async_postgres_pool, open_async_postgres_pool
+
 # Import header middleware
 from api.middleware.headers import add_header_middleware
 
@@ -49,8 +52,23 @@ from api.middleware.route_access import add_route_access_middleware
 # Import metric flush worker
 from api.metrics.flush_worker import flush_loop
 
+# Import last login flush worker
+from api.services.last_login_tracker import last_login_flush_loop, flush_last_logins
+
+# Import audit log flush worker
+from api.services.audit_log import audit_flush_loop, flush_audit_log
+
+# Import soft deleted user purge worker
+from api.services.user_purge import user_purge_loop
+
+# Import user change listener (cross-worker cache invalidation)
+from api.cache.user_change_listener import user_change_listener
+
+# Import legacy user database (persistent SQLite connections)
+from api.database.user_database.legacy_user_database import close_user_database
+
 # Import config
-from api.config.config import API_TITLE, API_DESCRIPTION, API_VERSION, API_PREFIX, LEGACY_API_PREFIX, API_DOCS_ENABLED, ALLOWED_HOSTS, ENABLE_LEGACY_ROUTES, DEMO_MODE
+from api.config.config import API_TITLE, API_DESCRIPTION, API_VERSION, API_PREFIX, LEGACY_API_PREFIX, API_DOCS_ENABLED, ALLOWED_HOSTS, ENABLE_LEGACY_ROUTES, DEMO_MODE, USER_CHANGE_LISTENER_ENABLED, USER_PURGE_ENABLED
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -61,29 +79,75 @@ async def lifespan(app: FastAPI):
 
     Startup:
         - Initialize database
-        - Start background flush worker
+        - Open async connection pool
+        - Start user change listener
+        - Start background flush workers
 
     Shutdown:
-        - Cancel background worker gracefully
+        - Cancel background workers gracefully
+        - Flush pending last_login values and audit events
+        - Stop user change listener
+        - Close async connection pool
+        - Close legacy user database connections
     """
 
     # Initialize database
     startup_database()
 
+    # Open async connection pool for v1 routes and authentication
+    await open_async_postgres_pool()
+
+    # Start listening for user changes made by other workers
+    if USER_CHANGE_LISTENER_ENABLED:
+        user_change_listener.start()
+
     # Start background metrics flush worker
     flush_task = asyncio.create_task(flush_loop())
     app.state.flush_task = flush_task
 
+    # Start background last login flush worker
+    last_login_task = asyncio.create_task(last_login_flush_loop())
+    app.state.last_login_task = last_login_task
+
+    # Start background audit log flush worker
+    audit_task = asyncio.create_task(audit_flush_loop())
+    app.state.audit_task = audit_task
+
+    background_tasks = [flush_task, last_login_task, audit_task]
+
+    # Start background purge worker for soft deleted users
+    if USER_PURGE_ENABLED:
+        purge_task = asyncio.create_task(user_purge_loop())
+        app.state.purge_task = purge_task
+        background_tasks.append(purge_task)
+
     try:
         yield
 
     finally:
-        flush_task.cancel()
+        for task in background_tasks:
+            task.cancel()
+
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
         try:
-            await flush_task
-        except asyncio.CancelledError:
-            pass
+            await flush_last_logins()
+        except Exception as e:
+            logger.error(f"Final last login flush failed: {e}")
+
+        try:
+            await flush_audit_log()
+        except Exception as e:
+            logger.error(f"Final audit log flush failed: {e}")
+
+        user_change_listener.stop()
+
+        await async_postgres_pool.close()
+
+        close_user_database()
 
 app = FastAPI(
     title=API_TITLE,
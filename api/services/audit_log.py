@@ -0,0 +1,125 @@
+"""
+Asynchronous audit log for user and permission changes.
+
+Routers only append an event to an in-memory queue. The flush loop writes
+all queued events to the `audit.admin_events` hypertable in one COPY per
+interval, so auditing never adds a database round trip to a request.
+"""
+
+# Async, time and thread utilities
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+# Database
+from api.database.audit_database.audit_database import audit_database
+
+# Logger
+from api.logger.logger import logger
+
+# Configuration
+from api.config.config import AUDIT_LOG_ENABLED, AUDIT_LOG_FLUSH_INTERVAL, AUDIT_LOG_MAX_QUEUE_SIZE
+
+class AuditLog:
+    """Bounded in-memory queue of audit events waiting to be flushed."""
+
+    def __init__(self, max_size: int = 100000, enabled: bool = True):
+        self.enabled = enabled
+        self.max_size = max(1, int(max_size))
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.recorded = 0
+        self.dropped = 0
+
+    def record(self, action: str, actor_user_id=None, target_user_id=None, details: dict = None) -> None:
+        """
+        Queue an audit event.
+
+        Args:
+            action: Event name (e.g. `user.delete`).
+            actor_user_id: User that performed the action.
+            target_user_id: Affected user, if any.
+            details: Optional JSON serializable context.
+        """
+        if not self.enabled:
+            return
+
+        event = (
+            datetime.now(timezone.utc),
+            str(actor_user_id) if actor_user_id is not None else None,
+            action,
+            str(target_user_id) if target_user_id is not None else None,
+            details
+        )
+
+        with self._lock:
+            if len(self._pending) >= self.max_size:
+                # The database is unreachable for a long time, keep memory bounded
+                self._pending.popleft()
+                self.dropped += 1
+
+            self._pending.append(event)
+            self.recorded += 1
+
+    def drain(self) -> list:
+        """Return and clear all pending events (oldest first)."""
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+        return list(pending)
+
+    def restore(self, events: list) -> None:
+        """Put drained events back in front of the queue after a failed flush."""
+        with self._lock:
+            room = max(0, self.max_size - len(self._pending))
+            if len(events) > room:
+                self.dropped += len(events) - room
+                events = events[len(events) - room:]
+
+            self._pending.extendleft(reversed(events))
+
+    def pending_count(self) -> int:
+        """Number of events waiting to be flushed."""
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> dict:
+        """Return queue counters."""
+        return {
+            "enabled": self.enabled,
+            "pending": self.pending_count(),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+        }
+
+async def flush_audit_log() -> int:
+    """
+    Write all pending audit events to the database.
+
+    Returns:
+        int: Number of written events.
+    """
+    events = audit_log.drain()
+    if not events:
+        return 0
+
+    try:
+        return await audit_database.insert_events(events)
+    except Exception:
+        audit_log.restore(events)
+        raise
+
+async def audit_flush_loop():
+    """Periodically flush pending audit events."""
+    while True:
+        await asyncio.sleep(AUDIT_LOG_FLUSH_INTERVAL)
+
+        try:
+            await flush_audit_log()
+        except Exception as e:
+            logger.error(f"Audit log flush failed: {e}")
+
+# Global singleton instance
+audit_log = AuditLog(max_size=AUDIT_LOG_MAX_QUEUE_SIZE, enabled=AUDIT_LOG_ENABLED)
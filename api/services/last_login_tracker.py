@@ -0,0 +1,98 @@
+"""
+Write-behind tracking of users.user.last_login and users.api_keys.last_used_at.
+
+Authenticated requests only record a timestamp in memory. The flush loop
+writes the newest timestamp per user (and per additional API key) in one
+batched UPDATE per interval.
+"""
+
+# Async, time and thread utilities
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+# Database
+from api.database.user_database.async_user_database import async_user_database
+
+# Logger
+from api.logger.logger import logger
+
+# Configuration
+from api.config.config import LAST_LOGIN_TRACKING_ENABLED, LAST_LOGIN_FLUSH_INTERVAL
+
+class LastLoginTracker:
+    """Coalesces last-seen timestamps per id (user_id or key_id) until they are flushed."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._pending: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id) -> None:
+        """Remember that `user_id` was seen now."""
+        if not self.enabled:
+            return
+
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[str(user_id)] = now
+
+    def drain(self) -> list:
+        """Return and clear all pending (user_id, last_login) pairs."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.items())
+
+    def restore(self, rows: list) -> None:
+        """Put drained rows back after a failed flush (newer timestamps win)."""
+        with self._lock:
+            for user_id, last_login in rows:
+                current = self._pending.get(user_id)
+                if current is None or current < last_login:
+                    self._pending[user_id] = last_login
+
+    def pending_count(self) -> int:
+        """Number of users waiting to be flushed."""
+        with self._lock:
+            return len(self._pending)
+
+async def flush_last_logins() -> int:
+    """
+    Flush all pending last_login and API key last_used_at timestamps to the database.
+
+    Returns:
+        int: Number of updated user and key records.
+    """
+    updated = 0
+
+    rows = last_login_tracker.drain()
+    if rows:
+        try:
+            updated += await async_user_database.update_last_logins(rows)
+        except Exception:
+            last_login_tracker.restore(rows)
+            raise
+
+    key_rows = api_key_usage_tracker.drain()
+    if key_rows:
+        try:
+            updated += await async_user_database.update_api_key_last_used(key_rows)
+        except Exception:
+            api_key_usage_tracker.restore(key_rows)
+            raise
+
+    return updated
+
+async def last_login_flush_loop():
+    """Periodically flush pending last_login timestamps."""
+    while True:
+        await asyncio.sleep(LAST_LOGIN_FLUSH_INTERVAL)
+
+        try:
+            await flush_last_logins()
+        except Exception as e:
+            logger.error(f"Last login flush failed: {e}")
+
+# Global singleton instance
+last_login_tracker = LastLoginTracker(enabled=LAST_LOGIN_TRACKING_ENABLED)
+api_key_usage_tracker = LastLoginTracker(enabled=LAST_LOGIN_TRACKING_ENABLED)
@@ -0,0 +1,101 @@
+"""
+Background purge of soft deleted users.
+
+Deleting a user only sets `user_perm.deleted_at`. This worker removes users
+whose retention window has passed in small batches (one short transaction
+each) and only while the server is quiet, so the cascade over the user
+tables never competes with request traffic.
+"""
+
+# Async utilities
+import asyncio
+
+# Database
+from api.database.user_database.async_user_database import async_user_database
+from api.database.async_postgres_pool import async_postgres_pool
+
+# System load
+from api.services.load_monitor import load_monitor
+
+# Logger
+from api.logger.logger import logger
+
+# Configuration
+from api.config.config import (
+    USER_PURGE_RETENTION,
+    USER_PURGE_INTERVAL,
+    USER_PURGE_BATCH_SIZE,
+    USER_PURGE_BATCH_DELAY,
+    USER_PURGE_MAX_CPU_LOAD
+)
+
+# Counters
+purge_stats = {
+    "runs": 0,
+    "skipped_busy": 0,
+    "purged": 0,
+    "last_error": None,
+}
+
+def is_quiet() -> bool:
+    """
+    Return whether the server is idle enough to purge.
+
+    Requires no request waiting for an async pool connection and (once the
+    load monitor has a sample) a CPU load below `USER_PURGE_MAX_CPU_LOAD`.
+    """
+    pool_stats = async_postgres_pool.stats()
+    if pool_stats.get("requests_waiting", 0) > 0:
+        return False
+
+    cpu_loads = load_monitor.get_last_cpu_loads(1)
+    if cpu_loads and cpu_loads[-1] > USER_PURGE_MAX_CPU_LOAD:
+        return False
+
+    return True
+
+async def purge_deleted_users() -> int:
+    """
+    Purge expired soft deleted users batch by batch while the server stays quiet.
+
+    Returns:
+        int: Number of purged users.
+    """
+    purged = 0
+
+    while is_quiet():
+        count = await async_user_database.purge_deleted_users(retention=USER_PURGE_RETENTION, batch_size=USER_PURGE_BATCH_SIZE)
+        purged += count
+
+        if count < USER_PURGE_BATCH_SIZE:
+            break
+
+        # Leave room for requests between batches
+        await asyncio.sleep(USER_PURGE_BATCH_DELAY)
+
+    return purged
+
+async def user_purge_loop():
+    """Periodically purge expired soft deleted users."""
+    while True:
+        await asyncio.sleep(USER_PURGE_INTERVAL)
+
+        if not async_user_database.is_ready():
+            continue
+
+        if not is_quiet():
+            purge_stats["skipped_busy"] += 1
+            continue
+
+        purge_stats["runs"] += 1
+
+        try:
+            purged = await purge_deleted_users()
+            purge_stats["purged"] += purged
+
+            if purged:
+                logger.info(f"Purged {purged} deleted users")
+
+        except Exception as e:
+            purge_stats["last_error"] = str(e)
+            logger.error(f"User purge failed: {e}")
@@ -0,0 +1,47 @@
+"""
+Opaque keyset pagination cursors.
+"""
+
+# Cursor encoding utilities
+import json
+import base64
+
+from api.exceptions.exceptions import InvalidCursorError
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last returned row into an opaque cursor.
+
+    Args:
+        values: JSON serializable key values (datetimes and UUIDs as str).
+
+    Returns:
+        str: URL safe cursor string.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """
+    Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor: Cursor string sent by the client.
+        length: Expected number of key values.
+
+    Returns:
+        list: The decoded key values.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Cursor could not be decoded")
+
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursorError("Cursor has an unexpected format")
+
+    return values
@@ -0,0 +1,87 @@
+"""
+Benchmark: API key lookups under concurrency, sync vs. async user database.
+
+The sync `UserDatabase` is called from the event loop the same way the old
+auth dependency did (blocking), the async one is awaited. With N concurrent
+lookups the sync version stays at roughly the single-connection throughput,
+the async version scales until the async pool is exhausted.
+
+The principal cache is disabled so every lookup hits the database.
+
+Usage (from the repository root, database running and migrated):
+
+    python -m benchmarks.user_database_concurrency --api-key <key> --requests 2000
+"""
+
+# Standard library
+import time
+import asyncio
+import argparse
+
+# Disable the principal cache before the databases are used
+from api.cache.principal_cache import principal_cache
+principal_cache.enabled = False
+
+# Databases
+from api.database.user_database.user_database import user_database
+from api.database.user_database.async_user_database import async_user_database
+from api.database.async_postgres_pool import async_postgres_pool, open_async_postgres_pool
+
+async def _run_sync(api_key: str, total: int, concurrency: int) -> float:
+    """Run `total` blocking lookups spread over `concurrency` tasks and return the duration."""
+    async def worker(count: int):
+        for _ in range(count):
+            user_database.get_user_perm_by_api_key(api_key)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+async def _run_async(api_key: str, total: int, concurrency: int) -> float:
+    """Run `total` awaited lookups spread over `concurrency` tasks and return the duration."""
+    async def worker(count: int):
+        for _ in range(count):
+            await async_user_database.get_user_perm_by_api_key(api_key)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async API key lookups under concurrency.")
+    parser.add_argument("--api-key", default=user_database.demo_api_key, help="Existing API key to look up")
+    parser.add_argument("--requests", type=int, default=2000, help="Lookups per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrency levels")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("--api-key is required when demo mode is disabled")
+
+    user_database.init_db()
+    if not await open_async_postgres_pool():
+        raise SystemExit("Could not open the async connection pool")
+    async_user_database.init_db()
+
+    # Warm up both pools and prepared statements
+    user_database.get_user_perm_by_api_key(args.api_key)
+    await async_user_database.get_user_perm_by_api_key(args.api_key)
+
+    print(f"{'concurrency':>11} | {'sync req/s':>10} | {'async req/s':>11} | {'speedup':>7}")
+    print("-" * 49)
+
+    try:
+        for concurrency in args.concurrency:
+            total = max(concurrency, args.requests - args.requests % concurrency)
+
+            sync_duration = await _run_sync(args.api_key, total, concurrency)
+            async_duration = await _run_async(args.api_key, total, concurrency)
+
+            sync_rps = total / sync_duration
+            async_rps = total / async_duration
+            print(f"{concurrency:>11} | {sync_rps:>10.0f} | {async_rps:>11.0f} | {async_rps / sync_rps:>6.2f}x")
+
+    finally:
+        await async_postgres_pool.close(silent=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""add username search indexes
+
+Revision ID: 2e8b5f3a9c61
+Revises: 9c4e2b7a1d53
+Create Date: 2026-10-16 15:08:31.947220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8b5f3a9c61'
+down_revision: Union[str, Sequence[str], None] = '9c4e2b7a1d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+    with op.get_context().autocommit_block():
+        # Prefix search (LIKE 'term%') and keyset order (USING ~<~)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_username_pattern "
+            "ON users.\"user\" (username text_pattern_ops);"
+        )
+
+        # Substring search (LIKE '%term%')
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_username_trgm "
+            "ON users.\"user\" USING GIN (username gin_trgm_ops);"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS users.idx_user_username_trgm;")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS users.idx_user_username_pattern;")
@@ -0,0 +1,79 @@
+"""add user change notify triggers
+
+Revision ID: 3a7c9e1f2b4d
+Revises: 4fafc0d8ed73
+Create Date: 2026-10-16 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c9e1f2b4d'
+down_revision: Union[str, Sequence[str], None] = '4fafc0d8ed73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.notify_user_change()
+        RETURNS trigger AS $$
+        DECLARE
+            changed_user_id UUID;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed_user_id := OLD.user_id;
+            ELSE
+                changed_user_id := NEW.user_id;
+            END IF;
+
+            -- Delivered on commit, identical payloads in one transaction are merged
+            PERFORM pg_notify(
+                'users_changed',
+                json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'op', TG_OP,
+                    'user_id', changed_user_id
+                )::text
+            );
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Only columns that end up in cached principals are watched
+    # => last_login updates etc. do not evict anything
+    op.execute("""
+        CREATE TRIGGER notify_user_change
+        AFTER UPDATE OF immutable OR DELETE ON users.user
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+    op.execute("""
+        CREATE TRIGGER notify_user_auth_change
+        AFTER INSERT OR UPDATE OF api_key_hash OR DELETE ON users.user_auth
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+    op.execute("""
+        CREATE TRIGGER notify_user_perm_change
+        AFTER UPDATE OF is_admin, activated OR DELETE ON users.user_perm
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notify_user_perm_change ON users.user_perm;")
+    op.execute("DROP TRIGGER IF EXISTS notify_user_auth_change ON users.user_auth;")
+    op.execute("DROP TRIGGER IF EXISTS notify_user_change ON users.user;")
+    op.execute("DROP FUNCTION IF EXISTS users.notify_user_change;")
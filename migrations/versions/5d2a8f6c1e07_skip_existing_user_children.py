@@ -0,0 +1,58 @@
+"""skip existing user children in create_user_children trigger
+
+Revision ID: 5d2a8f6c1e07
+Revises: 7b1e4d2c9a30
+Create Date: 2026-10-16 13:41:05.218374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f6c1e07'
+down_revision: Union[str, Sequence[str], None] = '7b1e4d2c9a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # User creation inserts the child rows itself (single CTE statement),
+    # the trigger only fills in rows that do not exist yet
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.create_user_children()
+        RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO users.user_perm (user_id)
+            VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+
+            INSERT INTO users.user_auth (user_id)
+            VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.create_user_children()
+        RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO users.user_perm (user_id)
+            VALUES (NEW.user_id);
+
+            INSERT INTO users.user_auth (user_id)
+            VALUES (NEW.user_id);
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
@@ -0,0 +1,139 @@
+"""add trigger maintained user counters
+
+Revision ID: 6f3d9a2b8e14
+Revises: 2e8b5f3a9c61
+Create Date: 2026-10-16 15:52:10.384629
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3d9a2b8e14'
+down_revision: Union[str, Sequence[str], None] = '2e8b5f3a9c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Single row table (id is always TRUE)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS users.user_counters (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            total_users BIGINT NOT NULL DEFAULT 0,
+            activated_users BIGINT NOT NULL DEFAULT 0,
+            active_admins BIGINT NOT NULL DEFAULT 0
+        );
+    """)
+
+    # Statement level triggers only see the changed rows through the transition
+    # tables, the counter row is updated once per statement (not per row)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.update_user_counters()
+        RETURNS trigger AS $$
+        DECLARE
+            delta_total BIGINT := 0;
+            delta_activated BIGINT := 0;
+            delta_admins BIGINT := 0;
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE users.user_counters
+                SET total_users = 0, activated_users = 0, active_admins = 0;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT
+                    delta_total + COUNT(*),
+                    delta_activated + COUNT(*) FILTER (WHERE activated),
+                    delta_admins + COUNT(*) FILTER (WHERE is_admin AND activated)
+                INTO delta_total, delta_activated, delta_admins
+                FROM new_rows;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT
+                    delta_total - COUNT(*),
+                    delta_activated - COUNT(*) FILTER (WHERE activated),
+                    delta_admins - COUNT(*) FILTER (WHERE is_admin AND activated)
+                INTO delta_total, delta_activated, delta_admins
+                FROM old_rows;
+            END IF;
+
+            IF delta_total <> 0 OR delta_activated <> 0 OR delta_admins <> 0 THEN
+                UPDATE users.user_counters
+                SET
+                    total_users = total_users + delta_total,
+                    activated_users = activated_users + delta_activated,
+                    active_admins = active_admins + delta_admins;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Block writes to user_perm so no change is missed between trigger creation and backfill
+    op.execute("LOCK TABLE users.user_perm IN SHARE ROW EXCLUSIVE MODE;")
+
+    # Transition tables require one trigger per event
+    op.execute("""
+        CREATE TRIGGER user_counters_insert
+        AFTER INSERT ON users.user_perm
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION users.update_user_counters();
+    """)
+
+    op.execute("""
+        CREATE TRIGGER user_counters_update
+        AFTER UPDATE ON users.user_perm
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION users.update_user_counters();
+    """)
+
+    op.execute("""
+        CREATE TRIGGER user_counters_delete
+        AFTER DELETE ON users.user_perm
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION users.update_user_counters();
+    """)
+
+    op.execute("""
+        CREATE TRIGGER user_counters_truncate
+        AFTER TRUNCATE ON users.user_perm
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION users.update_user_counters();
+    """)
+
+    # Backfill (writes to user_perm are blocked until the migration commits)
+    op.execute("""
+        INSERT INTO users.user_counters (id, total_users, activated_users, active_admins)
+        SELECT
+            TRUE,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE activated),
+            COUNT(*) FILTER (WHERE is_admin AND activated)
+        FROM users.user_perm
+        ON CONFLICT (id) DO UPDATE
+        SET
+            total_users = EXCLUDED.total_users,
+            activated_users = EXCLUDED.activated_users,
+            active_admins = EXCLUDED.active_admins;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS user_counters_truncate ON users.user_perm;")
+    op.execute("DROP TRIGGER IF EXISTS user_counters_delete ON users.user_perm;")
+    op.execute("DROP TRIGGER IF EXISTS user_counters_update ON users.user_perm;")
+    op.execute("DROP TRIGGER IF EXISTS user_counters_insert ON users.user_perm;")
+    op.execute("DROP FUNCTION IF EXISTS users.update_user_counters;")
+    op.execute("DROP TABLE IF EXISTS users.user_counters;")
@@ -0,0 +1,64 @@
+"""allow last_login updates on immutable users
+
+Revision ID: 7b1e4d2c9a30
+Revises: 3a7c9e1f2b4d
+Create Date: 2026-10-16 11:02:17.559041
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d2c9a30'
+down_revision: Union[str, Sequence[str], None] = '3a7c9e1f2b4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.prevent_immutable_user_change()
+        RETURNS trigger AS $$
+        BEGIN
+            -- Only check if trigger runs on users.user
+            IF TG_TABLE_NAME = 'user' THEN
+                IF OLD.immutable THEN
+                    -- Activity tracking may still update last_login of immutable users
+                    IF TG_OP = 'UPDATE'
+                        AND (to_jsonb(NEW) - 'last_login') = (to_jsonb(OLD) - 'last_login') THEN
+                        RETURN NEW;
+                    END IF;
+
+                    RAISE EXCEPTION 'Immutable user cannot be modified or deleted'
+                    USING ERRCODE = 'P7501';
+                END IF;
+            END IF;
+
+            RETURN COALESCE(NEW, OLD);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users.prevent_immutable_user_change()
+        RETURNS trigger AS $$
+        BEGIN
+            -- Only check if trigger runs on users.user
+            IF TG_TABLE_NAME = 'user' THEN
+                IF OLD.immutable THEN
+                    RAISE EXCEPTION 'Immutable user cannot be modified or deleted'
+                    USING ERRCODE = 'P7501';
+                END IF;
+            END IF;
+
+            RETURN COALESCE(NEW, OLD);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
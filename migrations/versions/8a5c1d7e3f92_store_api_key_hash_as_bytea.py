@@ -0,0 +1,72 @@
+"""store api key hashes as bytea with a hash index
+
+Revision ID: 8a5c1d7e3f92
+Revises: 6f3d9a2b8e14
+Create Date: 2026-10-16 16:34:58.172940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a5c1d7e3f92'
+down_revision: Union[str, Sequence[str], None] = '6f3d9a2b8e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The unique constraint was created without an explicit name (f97e0bcde1b2)
+    op.execute("""
+        DO $$
+        DECLARE
+            constraint_name TEXT;
+        BEGIN
+            SELECT c.conname INTO constraint_name
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+            WHERE c.conrelid = 'users.user_auth'::regclass
+                AND c.contype = 'u'
+                AND a.attname = 'api_key_hash';
+
+            IF constraint_name IS NOT NULL THEN
+                EXECUTE format('ALTER TABLE users.user_auth DROP CONSTRAINT %I', constraint_name);
+            END IF;
+        END;
+        $$;
+    """)
+
+    # 64 hex characters -> 32 raw bytes
+    op.execute("""
+        ALTER TABLE users.user_auth
+        ALTER COLUMN api_key_hash TYPE BYTEA
+        USING decode(api_key_hash, 'hex');
+    """)
+
+    # Hash indexes can not be UNIQUE, an exclusion constraint keeps the
+    # uniqueness and is backed by a hash index used for equality lookups
+    op.execute("""
+        ALTER TABLE users.user_auth
+        ADD CONSTRAINT user_auth_api_key_hash_excl
+        EXCLUDE USING hash (api_key_hash WITH =);
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE users.user_auth DROP CONSTRAINT IF EXISTS user_auth_api_key_hash_excl;")
+
+    op.execute("""
+        ALTER TABLE users.user_auth
+        ALTER COLUMN api_key_hash TYPE VARCHAR
+        USING encode(api_key_hash, 'hex');
+    """)
+
+    op.execute("""
+        ALTER TABLE users.user_auth
+        ADD CONSTRAINT user_auth_api_key_hash_key UNIQUE (api_key_hash);
+    """)
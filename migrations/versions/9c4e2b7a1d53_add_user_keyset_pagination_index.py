@@ -0,0 +1,35 @@
+"""add keyset pagination index on users.user
+
+Revision ID: 9c4e2b7a1d53
+Revises: 5d2a8f6c1e07
+Create Date: 2026-10-16 14:27:48.603117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2b7a1d53'
+down_revision: Union[str, Sequence[str], None] = '5d2a8f6c1e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Supports ORDER BY created_at DESC, user_id DESC and the
+    # (created_at, user_id) < (...) cursor condition of list_users
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_created_at_user_id "
+            "ON users.\"user\" (created_at DESC, user_id DESC);"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS users.idx_user_created_at_user_id;")
@@ -0,0 +1,31 @@
+"""add legacy username to imported users
+
+Revision ID: a7d3c5e9f1b4
+Revises: f5b8d2e6a3c7
+Create Date: 2026-10-17 09:12:44.508216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c5e9f1b4'
+down_revision: Union[str, Sequence[str], None] = 'f5b8d2e6a3c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lets the legacy migration tell already imported users apart from taken usernames
+    op.add_column('user', sa.Column('legacy_username', sa.String(), nullable=True), schema='users')
+    op.create_unique_constraint('user_legacy_username_key', 'user', ['legacy_username'], schema='users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('user_legacy_username_key', 'user', schema='users', type_='unique')
+    op.drop_column('user', 'legacy_username', schema='users')
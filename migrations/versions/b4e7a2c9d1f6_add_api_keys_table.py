@@ -0,0 +1,55 @@
+"""add api_keys table for multiple keys per user
+
+Revision ID: b4e7a2c9d1f6
+Revises: 8a5c1d7e3f92
+Create Date: 2026-10-16 17:12:44.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e7a2c9d1f6'
+down_revision: Union[str, Sequence[str], None] = '8a5c1d7e3f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keys have the form <key_prefix>.<secret>, the prefix is public and
+    # used for the (unique, indexed) lookup, the hash is compared afterwards
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS users.api_keys (
+            key_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            user_id UUID NOT NULL REFERENCES users.user (user_id) ON DELETE CASCADE,
+            key_prefix TEXT NOT NULL,
+            key_hash BYTEA NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            last_used_at TIMESTAMP,
+            revoked BOOLEAN NOT NULL DEFAULT FALSE,
+            CONSTRAINT api_keys_key_prefix_key UNIQUE (key_prefix)
+        );
+    """)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_api_keys_user_id_created_at
+        ON users.api_keys (user_id, created_at DESC);
+    """)
+
+    # Same notification as user_auth changes (see 3a7c9e1f2b4d)
+    op.execute("""
+        CREATE TRIGGER notify_api_key_change
+        AFTER INSERT OR UPDATE OF revoked OR DELETE ON users.api_keys
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notify_api_key_change ON users.api_keys;")
+    op.execute("DROP TABLE IF EXISTS users.api_keys;")
@@ -0,0 +1,64 @@
+"""add api key expiry for rotation grace windows
+
+Revision ID: c8f1e3a5b7d2
+Revises: b4e7a2c9d1f6
+Create Date: 2026-10-16 18:03:27.691852
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f1e3a5b7d2'
+down_revision: Union[str, Sequence[str], None] = 'b4e7a2c9d1f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL = never expires, enforced by the principal lookup queries
+    op.execute("ALTER TABLE users.api_keys ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;")
+    op.execute("ALTER TABLE users.user_auth ADD COLUMN IF NOT EXISTS api_key_expires_at TIMESTAMP;")
+
+    # Expiry changes have to evict cached principals in all workers
+    op.execute("DROP TRIGGER IF EXISTS notify_user_auth_change ON users.user_auth;")
+    op.execute("""
+        CREATE TRIGGER notify_user_auth_change
+        AFTER INSERT OR UPDATE OF api_key_hash, api_key_expires_at OR DELETE ON users.user_auth
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS notify_api_key_change ON users.api_keys;")
+    op.execute("""
+        CREATE TRIGGER notify_api_key_change
+        AFTER INSERT OR UPDATE OF revoked, expires_at OR DELETE ON users.api_keys
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notify_api_key_change ON users.api_keys;")
+    op.execute("""
+        CREATE TRIGGER notify_api_key_change
+        AFTER INSERT OR UPDATE OF revoked OR DELETE ON users.api_keys
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS notify_user_auth_change ON users.user_auth;")
+    op.execute("""
+        CREATE TRIGGER notify_user_auth_change
+        AFTER INSERT OR UPDATE OF api_key_hash OR DELETE ON users.user_auth
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+    op.execute("ALTER TABLE users.user_auth DROP COLUMN IF EXISTS api_key_expires_at;")
+    op.execute("ALTER TABLE users.api_keys DROP COLUMN IF EXISTS expires_at;")
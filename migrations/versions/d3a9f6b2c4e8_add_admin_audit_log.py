@@ -0,0 +1,50 @@
+"""add admin audit log hypertable
+
+Revision ID: d3a9f6b2c4e8
+Revises: c8f1e3a5b7d2
+Create Date: 2026-10-16 19:12:44.308519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f6b2c4e8'
+down_revision: Union[str, Sequence[str], None] = 'c8f1e3a5b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SCHEMA IF NOT EXISTS audit")
+
+    # No foreign keys: the trail has to outlive deleted users
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS audit.admin_events (
+            time TIMESTAMPTZ NOT NULL,
+            event_id UUID NOT NULL DEFAULT gen_random_uuid(),
+            actor_user_id UUID,
+            action TEXT NOT NULL,
+            target_user_id UUID,
+            details JSONB,
+            PRIMARY KEY (time, event_id)
+        );
+    """)
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb CASCADE;")
+    op.execute("SELECT create_hypertable('audit.admin_events', 'time', if_not_exists => TRUE);")
+
+    # Hypertables do not support CONCURRENTLY
+    op.execute("CREATE INDEX IF NOT EXISTS idx_admin_events_action_time ON audit.admin_events (action, time DESC);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_admin_events_actor_time ON audit.admin_events (actor_user_id, time DESC);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_admin_events_target_time ON audit.admin_events (target_user_id, time DESC);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS audit.admin_events;")
+    op.execute("DROP SCHEMA IF EXISTS audit;")
@@ -0,0 +1,120 @@
+"""add soft delete for users
+
+Revision ID: e1f4a7c3b9d6
+Revises: d3a9f6b2c4e8
+Create Date: 2026-10-16 20:04:51.772043
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4a7c3b9d6'
+down_revision: Union[str, Sequence[str], None] = 'd3a9f6b2c4e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_update_user_counters(filter_deleted: bool) -> None:
+    """(Re)create users.update_user_counters(), optionally ignoring soft deleted rows."""
+    live = "deleted_at IS NULL" if filter_deleted else "TRUE"
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users.update_user_counters()
+        RETURNS trigger AS $$
+        DECLARE
+            delta_total BIGINT := 0;
+            delta_activated BIGINT := 0;
+            delta_admins BIGINT := 0;
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE users.user_counters
+                SET total_users = 0, activated_users = 0, active_admins = 0;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT
+                    delta_total + COUNT(*),
+                    delta_activated + COUNT(*) FILTER (WHERE activated),
+                    delta_admins + COUNT(*) FILTER (WHERE is_admin AND activated)
+                INTO delta_total, delta_activated, delta_admins
+                FROM new_rows
+                WHERE {live};
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT
+                    delta_total - COUNT(*),
+                    delta_activated - COUNT(*) FILTER (WHERE activated),
+                    delta_admins - COUNT(*) FILTER (WHERE is_admin AND activated)
+                INTO delta_total, delta_activated, delta_admins
+                FROM old_rows
+                WHERE {live};
+            END IF;
+
+            IF delta_total <> 0 OR delta_activated <> 0 OR delta_admins <> 0 THEN
+                UPDATE users.user_counters
+                SET
+                    total_users = total_users + delta_total,
+                    activated_users = activated_users + delta_activated,
+                    active_admins = active_admins + delta_admins;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def _create_notify_user_perm_change(columns: str) -> None:
+    """(Re)create the change notification trigger on users.user_perm."""
+    op.execute("DROP TRIGGER IF EXISTS notify_user_perm_change ON users.user_perm;")
+    op.execute(f"""
+        CREATE TRIGGER notify_user_perm_change
+        AFTER UPDATE OF {columns} OR DELETE ON users.user_perm
+        FOR EACH ROW
+        EXECUTE FUNCTION users.notify_user_change();
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored next to the permission flags: the principal lookup and the
+    # counter triggers (transition tables of user_perm) already read this row.
+    # Soft deleted users keep their rows (and username) until they are purged.
+    op.execute("ALTER TABLE users.user_perm ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;")
+
+    # Purge worker: oldest deletions first
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_perm_deleted_at
+        ON users.user_perm (deleted_at)
+        WHERE deleted_at IS NOT NULL;
+    """)
+
+    # Soft deleted users leave the counters when deleted_at is set and are
+    # not subtracted a second time when the purge cascades to user_perm
+    _create_update_user_counters(filter_deleted=True)
+
+    # Soft deletion and restore have to evict cached principals in all workers
+    _create_notify_user_perm_change("is_admin, activated, deleted_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Purge soft deleted users while the counters still ignore them
+    op.execute("""
+        DELETE FROM users.user u
+        USING users.user_perm p
+        WHERE p.user_id = u.user_id
+            AND p.deleted_at IS NOT NULL;
+    """)
+
+    _create_notify_user_perm_change("is_admin, activated")
+    _create_update_user_counters(filter_deleted=False)
+
+    op.execute("DROP INDEX IF EXISTS users.idx_user_perm_deleted_at;")
+    op.execute("ALTER TABLE users.user_perm DROP COLUMN IF EXISTS deleted_at;")
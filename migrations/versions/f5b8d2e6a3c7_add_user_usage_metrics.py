@@ -0,0 +1,44 @@
+"""add per user usage metrics hypertable
+
+Revision ID: f5b8d2e6a3c7
+Revises: e1f4a7c3b9d6
+Create Date: 2026-10-16 20:41:09.135527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d2e6a3c7'
+down_revision: Union[str, Sequence[str], None] = 'e1f4a7c3b9d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per user and flush interval, no foreign key so usage survives user purges
+    op.create_table('user_usage',
+    sa.Column('time', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('total_response_time', sa.Float(), nullable=False),
+    sa.Column('response_bytes', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('time', 'user_id'),
+    schema='metrics'
+    )
+
+    op.execute("SELECT create_hypertable('metrics.user_usage', 'time', if_not_exists => TRUE);")
+
+    # Hypertables do not support CONCURRENTLY
+    op.execute("CREATE INDEX IF NOT EXISTS idx_user_usage_user_time ON metrics.user_usage (user_id, time DESC);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS metrics.idx_user_usage_user_time;")
+    op.drop_table('user_usage', schema='metrics')